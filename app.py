@@ -9,6 +9,13 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import io
+import os
+import time
+
+from spam_detection.explorer import Explorer
+from spam_detection.metrics import METRICS_PATH, read_metrics
+from spam_detection.registry import OUTPUT_DIR, detail_path, fingerprint, list_runs
+from spam_detection.storage import read_results, read_texts
 
 # ----------------------------
 # PAGE CONFIG (harus paling atas)
@@ -29,6 +36,7 @@ PAGE_OPTIONS = [
     "📈 Visualizations",
     "📝 Reports",
     "💡 Insights",
+    "📡 Run Monitor",
 ]
 
 def _init_state():
@@ -118,26 +126,227 @@ st.markdown("""
 # ===============================
 # FUNGSI LOAD DATA (CACHE)
 # ===============================
-@st.cache_data
-def load_spam_data():
-    """Muat data utama deteksi spam dari CSV. Kembalikan (DataFrame, status_bool)."""
+LIVE_REFRESH_SECONDS = 5
+# Kolom yang dipakai dashboard; kolom teks besar lain (full_analysis, full_text) tidak dimuat
+DASHBOARD_COLUMNS = [
+    "id_str", "created_at", "username", "processed_text",
+    "spam_classification", "confidence_score", "spam_indicators", "cluster_id",
+]
+
+# Scan ulang Output/ berkala agar run baru muncul tanpa restart dashboard
+@st.cache_data(ttl=10)
+def get_runs(output_dir=OUTPUT_DIR):
+    """Daftar run hasil deteksi (terbaru dulu) dari registry Output/."""
+    return list_runs(output_dir)
+
+def _version(path):
+    """Versi artefak = (path, mtime+ukuran); berubah saat pipeline menulis ulang file."""
+    return (path, fingerprint(path)) if path else (None, "missing")
+
+# cache_resource: DataFrame dibagi antar rerun tanpa di-copy/di-pickle (anggap read-only)
+@st.cache_resource(max_entries=2)
+def load_spam_data(version):
+    """
+    Muat data utama deteksi spam. Pakai dataset Parquet jika ada (hanya kolom
+    yang dibutuhkan), fallback ke CSV lama. Kembalikan (DataFrame, status_bool).
+    """
+    path, _ = version
     try:
-        df = pd.read_csv("Output/deteksi_spam_detail_20250828_070506.csv")
+        if os.path.isdir(path):
+            df = read_results(path, columns=DASHBOARD_COLUMNS)
+            reasons = read_texts(path, columns=["spam_reason"])
+            df = df.merge(reasons, on="id_str", how="left")
+            # list<string> -> teks agar bisa ditampilkan & diekspor ke CSV/Excel
+            df["spam_indicators"] = df["spam_indicators"].map("; ".join)
+        else:
+            df = pd.read_csv(path, dtype={"id_str": str})
         return df, True
     except Exception:
         return None, False
 
-@st.cache_data
-def load_report():
+@st.cache_data(max_entries=4)
+def load_report(version):
     """Muat laporan MD (jika ada). Kembalikan (str, status_bool)."""
+    path, _ = version
     try:
-        with open("Output/spam_detection_report_20250828_070511.md", "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             return f.read(), True
     except Exception:
         return None, False
 
-df_spam, data_loaded = load_spam_data()
-report_content, report_loaded = load_report()
+# ===============================
+# DATA LAYER (AGREGAT, FILTER, EKSPOR)
+# ===============================
+@st.cache_data(max_entries=4)
+def get_aggregates(version):
+    """Agregat dihitung sekali per versi dataset (dipakai sidebar & overview)."""
+    df, ok = load_spam_data(version)
+    if not ok or df is None:
+        return None
+    total = len(df)
+    if "spam_classification" in df.columns:
+        counts = df["spam_classification"].value_counts()
+        counts = counts[counts > 0]
+    else:
+        counts = pd.Series(dtype="int64")
+    return {
+        "total": total,
+        "spam": int(counts.get("Spam", 0)),
+        "not_spam": int(counts.get("Not Spam", 0)) if "spam_classification" in df.columns else total,
+        "class_counts": {str(k): int(v) for k, v in counts.items()},
+    }
+
+@st.cache_resource(max_entries=2, show_spinner="Membangun index pencarian...")
+def get_explorer(version):
+    """Index filter + full-text (FTS5) dibangun sekali per versi dataset."""
+    df, _ = load_spam_data(version)
+    return Explorer(df)
+
+@st.cache_resource(max_entries=16)
+def get_filter_index(version, query):
+    """
+    Posisi baris untuk kombinasi filter `query` (tuple pasangan key/value),
+    berupa array index, bukan salinan DataFrame.
+    """
+    return get_explorer(version).query(**dict(query))
+
+@st.cache_data(max_entries=8, show_spinner="Menyiapkan file unduhan...")
+def build_export(version, query, fmt):
+    """Payload CSV/Excel dibuat hanya saat diminta, lalu dimemo per filter."""
+    df, _ = load_spam_data(version)
+    view = df.iloc[get_filter_index(version, query)]
+    if fmt == "csv":
+        return view.to_csv(index=False).encode("utf-8")
+    bio = io.BytesIO()
+    with pd.ExcelWriter(bio, engine="xlsxwriter") as writer:
+        view.to_excel(writer, index=False, sheet_name="Spam Analysis")
+    return bio.getvalue()
+
+def _lazy_download(label, fmt, file_name, mime, version, query):
+    """Tombol 'Prepare' dulu; file baru dibangun saat user benar-benar meminta."""
+    ready_key = f"export_ready::{version}::{query}::{fmt}"
+    if st.session_state.get(ready_key):
+        st.download_button(
+            label=label,
+            data=build_export(version, query, fmt),
+            file_name=file_name,
+            mime=mime,
+            use_container_width=True
+        )
+    elif st.button(f"⚙️ Prepare {fmt.upper()}", key=f"prepare_{fmt}", use_container_width=True):
+        st.session_state[ready_key] = True
+        _rerun()
+
+# ===============================
+# RUN MONITOR (METRIK LIVE)
+# ===============================
+MONITOR_REFRESH_SECONDS = 2
+
+def _metric_by_label(items, name, label):
+    """Nilai counter `name` dikelompokkan per nilai label `label`."""
+    out = {}
+    for item in items:
+        if item["name"] == name:
+            key = item["labels"].get(label, "-")
+            out[key] = out.get(key, 0) + item["value"]
+    return out
+
+def _metric_total(items, name):
+    return sum(item["value"] for item in items if item["name"] == name)
+
+def _throughput(history, window=30):
+    """Tweet/detik selama `window` detik terakhir dari history snapshot."""
+    if len(history) < 2:
+        return 0.0
+    last = history[-1]
+    first = next((h for h in history if last["t"] - h["t"] <= window), history[0])
+    dt = last["t"] - first["t"]
+    return (last["tweets"] - first["tweets"]) / dt if dt > 0 else 0.0
+
+def _timing_table(histograms):
+    """Tabel durasi per tahap (histogram), diurutkan dari total waktu terbesar."""
+    rows = [{
+        "Stage": h["name"] + "".join(f" [{v}]" for v in h["labels"].values()),
+        "Count": h["count"],
+        "Total (s)": round(h["sum"], 2),
+        "Mean (ms)": round(h["sum"] / h["count"] * 1000, 2) if h["count"] else None,
+        "p50 (ms)": round(h["p50"] * 1000, 2) if h["p50"] is not None else None,
+        "p90 (ms)": round(h["p90"] * 1000, 2) if h["p90"] is not None else None,
+        "p99 (ms)": round(h["p99"] * 1000, 2) if h["p99"] is not None else None,
+    } for h in histograms]
+    return pd.DataFrame(rows).sort_values("Total (s)", ascending=False) if rows else pd.DataFrame()
+
+def render_run_monitor(path):
+    """Tampilkan snapshot metrik terakhir dari `path`."""
+    metrics = read_metrics(path)
+    if metrics is None:
+        st.markdown(f"""
+        <div class="warning-box">
+            ⚠️ <strong>No metrics yet:</strong> <code>{path}</code> not found.
+            <br>Run the detection notebook with <code>MetricsWriter</code> enabled (writes <code>run_metrics.json</code>).
+        </div>
+        """, unsafe_allow_html=True)
+        return
+
+    counters, gauges, history = metrics["counters"], metrics["gauges"], metrics.get("history", [])
+    classified = _metric_total(counters, "tweets_classified_total")
+    target = _metric_total(gauges, "run_llm_tweets_total")
+    errors = _metric_total(counters, "llm_errors_total")
+    retries = _metric_total(counters, "llm_retries_total")
+    hit_rate = metrics.get("cache_hit_rate")
+    age = time.time() - metrics["updated_at"]
+    status_icon = {"running": "🟢", "finished": "✅", "failed": "❌"}.get(metrics["status"], "⚪")
+    st.markdown(f"{status_icon} **Status:** `{metrics['status']}` • **Run:** `{metrics.get('run_id') or '-'}` "
+                f"• **Updated:** {age:.0f}s ago • **Elapsed:** {(metrics['updated_at'] - metrics['started_at']) / 60:.1f} min")
+    if target:
+        st.progress(min(1.0, classified / target), text=f"{classified:,} / {target:,} tweets via LLM")
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    cards = [
+        (col1, "🧮 Classified", f"{classified:,}", "accent-blue"),
+        (col2, "⚡ Tweets/s", f"{_throughput(history):.2f}", "accent-purple"),
+        (col3, "🔁 Retries", f"{retries:,}", "accent-orange"),
+        (col4, "⚠️ Errors", f"{errors:,}", "accent-red"),
+        (col5, "🗄️ Cache Hit", f"{hit_rate * 100:.1f}%" if hit_rate is not None else "N/A", "accent-green"),
+    ]
+    for col, title, value, color in cards:
+        with col:
+            st.markdown(f"""<div class="metric-card"><h3>{title}</h3><h2 style="color: var(--{color});">{value}</h2></div>""", unsafe_allow_html=True)
+
+    st.markdown("### ⏱️ Time Breakdown")
+    timing = _timing_table(metrics["histograms"])
+    if len(timing):
+        st.dataframe(timing, use_container_width=True, hide_index=True)
+    else:
+        st.info("No timings recorded yet.")
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("### 📈 Throughput")
+        if len(history) >= 2:
+            hist_df = pd.DataFrame(history)
+            hist_df["time"] = pd.to_datetime(hist_df["t"], unit="s")
+            rate = hist_df["tweets"].diff() / hist_df["t"].diff()
+            fig = go.Figure(go.Scatter(x=hist_df["time"], y=rate, mode="lines", line=dict(color="#1f6feb")))
+            fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), yaxis_title="tweets/s",
+                              paper_bgcolor='#161b22', plot_bgcolor='#161b22', font=dict(color='#f0f6fc'))
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Waiting for more snapshots...")
+    with c2:
+        st.markdown("### 🚨 Retries & Errors by Type")
+        by_type = pd.DataFrame({
+            "Retries": _metric_by_label(counters, "llm_retries_total", "type"),
+            "Errors": _metric_by_label(counters, "llm_errors_total", "type"),
+        }).fillna(0).astype(int)
+        if len(by_type):
+            st.dataframe(by_type, use_container_width=True)
+        else:
+            st.success("No retries or errors.")
+        st.markdown("### 🔤 Tokens (estimated)")
+        st.markdown(f"- **Prompt**: {_metric_total(counters, 'llm_prompt_tokens_total'):,}\n"
+                    f"- **Completion**: {_metric_total(counters, 'llm_completion_tokens_total'):,}\n"
+                    f"- **Decided by prefilter**: {_metric_total(counters, 'prefilter_decisions_total'):,}")
 
 # ===============================
 # SIDEBAR + NAVIGASI (AMAN)
@@ -161,15 +370,55 @@ st.sidebar.markdown("### 🔧 Settings")
 show_raw_data = st.sidebar.checkbox("Show Raw Data", value=False)
 max_rows = st.sidebar.slider("Max Rows to Display", 10, 100, 20)
 
+# ===============================
+# PILIH RUN + LOAD DATA
+# ===============================
 st.sidebar.markdown("---")
-if data_loaded and df_spam is not None:
-    total_tweets = len(df_spam)
-    if "spam_classification" in df_spam.columns:
-        counts = df_spam["spam_classification"].value_counts()
-        spam_count = counts.get("Spam", 0)
-        non_spam_count = counts.get("Not Spam", 0)
-    else:
-        spam_count, non_spam_count = 0, total_tweets
+st.sidebar.markdown("### 🗂️ Detection Run")
+runs = get_runs()
+run_ids = [r["run_id"] for r in runs]
+if run_ids:
+    if st.session_state.get("run_id") not in run_ids:
+        st.session_state["run_id"] = run_ids[0]
+    st.sidebar.selectbox(
+        "Select Run:",
+        run_ids,
+        format_func=lambda rid: next(r["timestamp"].strftime("%d %b %Y %H:%M:%S") for r in runs if r["run_id"] == rid),
+        key="run_id",
+    )
+    run_artifacts = next(r for r in runs if r["run_id"] == st.session_state["run_id"])["artifacts"]
+    data_path = detail_path({"artifacts": run_artifacts})
+else:
+    run_artifacts, data_path = {}, None
+    st.sidebar.markdown(f"No runs found in `{OUTPUT_DIR}/`")
+if st.sidebar.button("🔄 Rescan Output", use_container_width=True):
+    get_runs.clear()
+    _rerun()
+live_updates = st.sidebar.toggle("🔴 Live updates", value=False, key="live_updates",
+                                 help="Ikuti run yang sedang ditulis scoring service")
+
+data_version = _version(data_path)
+
+if live_updates:
+    # Cek ringan berkala (fingerprint file + daftar run); dashboard dirender ulang
+    # hanya jika dataset terpilih berubah atau ada run baru
+    @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+    def _watch_output(version, latest_run):
+        newest = list_runs(OUTPUT_DIR)
+        if _version(data_path) != version or (newest and newest[0]["run_id"] != latest_run):
+            get_runs.clear()
+            st.rerun()
+
+    _watch_output(data_version, run_ids[0] if run_ids else None)
+df_spam, data_loaded = load_spam_data(data_version) if data_path else (None, False)
+aggregates = get_aggregates(data_version) if data_loaded else None
+report_content, report_loaded = load_report(_version(run_artifacts.get("report")))
+
+st.sidebar.markdown("---")
+if data_loaded and aggregates is not None:
+    total_tweets = aggregates["total"]
+    spam_count = aggregates["spam"]
+    non_spam_count = aggregates["not_spam"]
     st.sidebar.markdown(f"""
 ### 📊 Quick Stats
 - **Total Tweets**: {total_tweets:,}
@@ -188,7 +437,7 @@ else:
 
 # Quick Navigation (selalu via _goto)
 st.markdown("### 🧭 Quick Navigation")
-c1, c2, c3, c4, c5 = st.columns(5)
+c1, c2, c3, c4, c5, c6 = st.columns(6)
 with c1:
     if st.button("📊 Overview", use_container_width=True):
         _goto("📊 Overview & Metrics")
@@ -204,6 +453,9 @@ with c4:
 with c5:
     if st.button("💡 Insights", use_container_width=True):
         _goto("💡 Insights")
+with c6:
+    if st.button("📡 Monitor", use_container_width=True):
+        _goto("📡 Run Monitor")
 
 st.markdown("---")
 
@@ -217,14 +469,10 @@ if page == "📊 Overview & Metrics":
     if data_loaded and df_spam is not None:
         col1, col2, col3, col4 = st.columns(4)
         try:
-            total_tweets = len(df_spam)
-            if "spam_classification" in df_spam.columns:
-                vc = df_spam["spam_classification"].value_counts()
-                spam_count = vc.get("Spam", 0)
-                non_spam_count = vc.get("Not Spam", 0)
-                spam_percentage = (spam_count / total_tweets * 100) if total_tweets > 0 else 0
-            else:
-                spam_count, non_spam_count, spam_percentage = 0, total_tweets, 0
+            total_tweets = aggregates["total"]
+            spam_count = aggregates["spam"]
+            non_spam_count = aggregates["not_spam"]
+            spam_percentage = (spam_count / total_tweets * 100) if total_tweets > 0 else 0
         except Exception as e:
             st.error(f"Error calculating metrics: {e}")
             total_tweets = spam_count = non_spam_count = 0
@@ -241,10 +489,10 @@ if page == "📊 Overview & Metrics":
 
         if "spam_classification" in df_spam.columns:
             st.markdown("### 📊 Spam Distribution")
-            vc = df_spam["spam_classification"].value_counts()
+            vc = aggregates["class_counts"]
             fig = go.Figure(data=[go.Pie(
-                labels=vc.index,
-                values=vc.values,
+                labels=list(vc.keys()),
+                values=list(vc.values()),
                 hole=0.6,
                 marker_colors=['#da3633', '#238636'],
                 textinfo='label+percent',
@@ -265,8 +513,8 @@ if page == "📊 Overview & Metrics":
     else:
         st.markdown("""
         <div class="warning-box">
-            ⚠️ <strong>Data files not found.</strong> Ensure this file exists:
-            <br>• <code>Output/deteksi_spam_detail_20250828_070506.csv</code>
+            ⚠️ <strong>Data files not found.</strong> Ensure a detection run exists in:
+            <br>• <code>Output/deteksi_spam_detail_&lt;timestamp&gt;.csv</code> (or Parquet dataset directory)
         </div>
         """, unsafe_allow_html=True)
 
@@ -286,52 +534,79 @@ elif page == "📋 Detailed Data":
         else:
             st.markdown('<div class="info-box">ℹ️ <strong>Note:</strong> spam_classification column not found. Showing all data.</div>', unsafe_allow_html=True)
 
-        filtered_df = df_spam.copy()
+        explorer = get_explorer(data_version)
+        fc1, fc2 = st.columns([2, 1])
+        with fc1:
+            search_text = st.text_input("🔎 Search text / reason:", key="data_search",
+                                        placeholder="e.g. promo gratis")
+        with fc2:
+            conf_range = st.slider("Confidence Score:", 0, 10, (0, 10), key="data_confidence")
+        fc3, fc4, fc5 = st.columns(3)
+        with fc3:
+            indicator = st.text_input("Indicator contains:", key="data_indicator",
+                                      placeholder="e.g. Clickbait")
+        with fc4:
+            username = st.text_input("Username:", key="data_username", placeholder="@username")
+        date_from = date_to = None
+        with fc5:
+            bounds = explorer.date_range()
+            if bounds:
+                picked = st.date_input("Date Range:", value=bounds, min_value=bounds[0],
+                                       max_value=bounds[1], key="data_dates")
+                if isinstance(picked, (list, tuple)) and len(picked) == 2 and tuple(picked) != bounds:
+                    date_from, date_to = str(picked[0]), str(picked[1])
+
+        filter_type = st.session_state["filter_type"]
+        # Query sebagai tuple agar bisa jadi kunci cache; filter default diabaikan
+        query = tuple((k, v) for k, v in [
+            ("classification", filter_type),
+            ("min_confidence", conf_range[0] if conf_range != (0, 10) else None),
+            ("max_confidence", conf_range[1] if conf_range != (0, 10) else None),
+            ("indicator", indicator.strip() or None),
+            ("username", username.strip() or None),
+            ("date_from", date_from),
+            ("date_to", date_to),
+            ("text", search_text.strip() or None),
+        ] if v not in (None, "All"))
         try:
-            if st.session_state["filter_type"] == "Spam":
-                filtered_df = filtered_df[filtered_df["spam_classification"] == "Spam"]
-            elif st.session_state["filter_type"] == "Not Spam":
-                filtered_df = filtered_df[filtered_df["spam_classification"] == "Not Spam"]
+            filtered_idx = get_filter_index(data_version, query)
         except Exception as e:
             st.error(f"Error applying filter: {e}")
-            filtered_df = df_spam.copy()
+            query = ()
+            filtered_idx = get_filter_index(data_version, query)
 
+        file_suffix = filter_type.lower().replace(' ', '_')
         cdl1, cdl2, _ = st.columns([1, 1, 2])
         with cdl1:
-            csv = filtered_df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"spam_data_{st.session_state['filter_type'].lower().replace(' ', '_')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+            _lazy_download("📥 Download CSV", "csv", f"spam_data_{file_suffix}.csv",
+                           "text/csv", data_version, query)
         with cdl2:
-            bio = io.BytesIO()
-            with pd.ExcelWriter(bio, engine="xlsxwriter") as writer:
-                filtered_df.to_excel(writer, index=False, sheet_name="Spam Analysis")
-            st.download_button(
-                label="📊 Download Excel",
-                data=bio.getvalue(),
-                file_name=f"spam_analysis_{st.session_state['filter_type'].lower().replace(' ', '_')}.xlsx",
-                mime="application/vnd.ms-excel",
-                use_container_width=True
-            )
+            _lazy_download("📊 Download Excel", "xlsx", f"spam_analysis_{file_suffix}.xlsx",
+                           "application/vnd.ms-excel", data_version, query)
 
         st.markdown("---")
-        display_cols = ["processed_text", "spam_reason"]
-        avail = [c for c in display_cols if c in filtered_df.columns]
+        # Paginasi offset/limit: hanya baris di halaman aktif yang diambil dari DataFrame
+        total_pages = max(1, -(-len(filtered_idx) // max_rows))
+        if st.session_state.get("data_query") != (data_version, query, max_rows):
+            st.session_state["data_query"] = (data_version, query, max_rows)
+            st.session_state["data_page"] = 1
+        page_no = st.number_input(f"Page (of {total_pages:,}):", min_value=1, max_value=total_pages,
+                                  step=1, key="data_page")
+        offset = (page_no - 1) * max_rows
+        display_cols = ["processed_text", "spam_classification", "confidence_score", "spam_reason"]
+        page_df = explorer.page(filtered_idx, offset, max_rows)
+        avail = [c for c in display_cols if c in page_df.columns]
         if not avail:
             st.markdown('<div class="warning-box">⚠️ <strong>Column Notice:</strong> processed_text / spam_reason not found.</div>', unsafe_allow_html=True)
-            st.dataframe(filtered_df.head(max_rows), use_container_width=True)
+            st.dataframe(page_df, use_container_width=True)
         else:
-            st.dataframe(filtered_df[avail].head(max_rows), use_container_width=True)
+            st.dataframe(page_df[avail], use_container_width=True)
 
         st.markdown(f"""
         <div style="background: var(--secondary-dark); padding: 1rem; border-radius: 6px; border: 1px solid var(--border-color); margin-top: 1rem;">
-            <strong>📊 Dataset Statistics:</strong> {len(filtered_df):,} records | 
-            <strong>Filter:</strong> {st.session_state['filter_type']} | 
-            <strong>Showing:</strong> Top {min(max_rows, len(filtered_df))} rows
+            <strong>📊 Dataset Statistics:</strong> {len(filtered_idx):,} records | 
+            <strong>Filter:</strong> {filter_type} | 
+            <strong>Showing:</strong> rows {min(offset + 1, len(filtered_idx)):,}–{min(offset + max_rows, len(filtered_idx)):,}
         </div>
         """, unsafe_allow_html=True)
     else:
@@ -343,13 +618,13 @@ elif page == "📈 Visualizations":
     with c1:
         st.markdown("### ☁️ Wordcloud Analysis")
         try:
-            st.image("Output/wordcloud_spam_analysis_20250828_070512.png", caption="Wordcloud: Spam vs Non-Spam Terms", use_container_width=True)
+            st.image(run_artifacts["wordcloud"], caption="Wordcloud: Spam vs Non-Spam Terms", use_container_width=True)
         except Exception:
             st.markdown('<div class="warning-box">⚠️ <strong>Image Missing:</strong> Wordcloud visualization not found</div>', unsafe_allow_html=True)
     with c2:
         st.markdown("### 📊 Detailed Spam Analysis")
         try:
-            st.image("Output/visualisasi_spam_detail_20250828_070506.png", caption="Comprehensive Spam Detection Analysis", use_container_width=True)
+            st.image(run_artifacts["visualization"], caption="Comprehensive Spam Detection Analysis", use_container_width=True)
         except Exception:
             st.markdown('<div class="warning-box">⚠️ <strong>Image Missing:</strong> Analysis visualization not found</div>', unsafe_allow_html=True)
 
@@ -421,6 +696,21 @@ elif page == "💡 Insights":
         </div>
         """, unsafe_allow_html=True)
 
+elif page == "📡 Run Monitor":
+    st.markdown('<div class="section-header"><h2>📡 Run Monitor</h2></div>', unsafe_allow_html=True)
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        metrics_path = st.text_input("Metrics file:", value=METRICS_PATH, key="monitor_path")
+    with c2:
+        auto_refresh = st.toggle(f"Auto-refresh ({MONITOR_REFRESH_SECONDS}s)", value=True, key="monitor_refresh")
+
+    # Fragment: hanya bagian ini yang dirender ulang berkala, bukan seluruh dashboard
+    @st.fragment(run_every=MONITOR_REFRESH_SECONDS if auto_refresh else None)
+    def _live_monitor():
+        render_run_monitor(metrics_path)
+
+    _live_monitor()
+
 # ===============================
 # FOOTER
 # ===============================
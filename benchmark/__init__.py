@@ -0,0 +1,10 @@
+"""
+Benchmark offline pipeline deteksi spam.
+
+    python -m benchmark.run --sizes 1000 10000 100000 --output bench.json
+
+Dataset `Dataset/demoDPR_gabungan.csv` diperbesar secara sintetis, lalu setiap
+tahap pipeline (load, preprocess, dedup, prefilter, klasifikasi ke mock Granite
+server, checkpoint, penyimpanan, word stats, load dashboard) diukur dan hasilnya
+ditulis sebagai JSON untuk dibandingkan antar versi (`--baseline`).
+"""
@@ -0,0 +1,138 @@
+"""
+Mock endpoint Granite untuk benchmark: `POST {"prompt": ...} -> {"output": ...}`.
+
+Jawaban dibuat oleh `StubLLM` (format KLASIFIKASI/... atau JSON batch) dengan
+latensi, error rate, batas concurrency, dan rate limit (429 + Retry-After)
+yang bisa diatur.
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from spam_detection.backends import StubHTTPError, StubLLM
+
+
+class RateLimiter:
+    """Token bucket non-blocking: `try_acquire` False -> server menjawab 429."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog default (5) terlalu kecil untuk banyak worker yang connect bersamaan;
+    # SYN yang ditolak baru dicoba ulang ~1 detik kemudian dan merusak p99
+    request_queue_size = 128
+
+
+class MockGraniteServer:
+    """
+    Server HTTP mock di thread terpisah. `rate_limit` = request/detik (None = tanpa
+    batas); `max_concurrency` = request paralel sebelum 429.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, rate_limit=None,
+                 max_concurrency=None, host="127.0.0.1", port=0, seed=42):
+        self.llm = StubLLM(latency=latency, jitter=jitter, error_rate=error_rate,
+                           max_concurrency=max_concurrency, seed=seed)
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self.httpd = _HTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/completions"
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Header & body ditulis terpisah; tanpa TCP_NODELAY, Nagle + delayed ACK
+                # menambah ~40 ms per request keep-alive
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _reply(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                prompt = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))["prompt"]
+                server._count('requests')
+                if server.limiter and not server.limiter.try_acquire():
+                    server._count('rate_limited')
+                    return self._reply(429, {"error": "Too Many Requests"}, {"Retry-After": "0.5"})
+                try:
+                    output = server.llm.invoke(prompt)
+                except StubHTTPError as e:
+                    server._count('rate_limited' if e.status_code == 429 else 'errors')
+                    return self._reply(e.status_code, {"error": str(e)})
+                self._reply(200, {"output": output})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock Granite endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    args = parser.parse_args()
+    server = MockGraniteServer(latency=args.latency, error_rate=args.error_rate,
+                               rate_limit=args.rate_limit, port=args.port)
+    print(f"🚀 Mock Granite di {server.url}")
+    server.httpd.serve_forever()
@@ -0,0 +1,353 @@
+"""
+Harness benchmark pipeline deteksi spam (offline, mock Granite server).
+
+Setiap ukuran dataset dijalankan di proses terpisah (spawn) agar peak RSS
+tidak tercampur antar ukuran. Output JSON:
+
+    {"meta": {...}, "results": [{"rows": N, "stages": {...}, "classification": {...},
+                                 "peak_rss_mb": ...}, ...]}
+
+Contoh:
+
+    python -m benchmark.run --sizes 1000 10000 --latency 0.05 --error-rate 0.01 -o bench.json
+    python -m benchmark.run --sizes 1000 10000 --baseline bench.json   # cek regresi
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import cycle, islice
+from multiprocessing import get_context
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+STAGES = ["load", "preprocess", "dedup", "prefilter", "classify", "checkpoint",
+          "storage", "wordstats", "report", "app_load"]
+
+# metrik -> arah yang lebih baik, untuk perbandingan dengan baseline
+HIGHER_IS_BETTER = {"tweets_per_sec"}
+COMPARED_METRICS = ["tweets_per_sec", "latency_p50_ms", "latency_p99_ms"]
+
+
+def _rss_mb():
+    """RSS saat ini (Linux /proc), atau None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class TimedLLM:
+    """Bungkus `llm.invoke` untuk mencatat latensi setiap panggilan (detik)."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        start = time.perf_counter()
+        try:
+            return self.llm.invoke(prompt)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+
+def bench_size(n_rows, config):
+    """Jalankan semua tahap untuk satu ukuran dataset (di proses anak)."""
+    import pandas as pd
+
+    from benchmark.synth import synthesize
+    from spam_detection.backends import HTTPLLM
+    from spam_detection.batch import BatchClassifier
+    from spam_detection.checkpoint import RESULT_COLUMNS, ResultLog
+    from spam_detection.dedup import assign_clusters, propagate_labels
+    from spam_detection.ingest import read_crawl_file
+    from spam_detection.prefilter import Prefilter, local_result
+    from spam_detection.report import build_report, render_markdown
+    from spam_detection.storage import write_results
+    from spam_detection.wordstats import compute_word_stats, iter_frames
+
+    enabled = set(config["stages"])
+    stages = {}
+
+    @contextmanager
+    def stage(name, rows):
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        stages[name] = {
+            'rows': int(rows),
+            'seconds': round(seconds, 4),
+            'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+            'rss_mb': round(_rss_mb(), 1) if _rss_mb() else None,
+        }
+
+    workdir = tempfile.mkdtemp(prefix="spam_bench_")
+    try:
+        crawl_csv = os.path.join(workdir, "crawl.csv")
+        synthesize(n_rows, dup_ratio=config["dup_ratio"]).to_csv(crawl_csv, index=False)
+
+        with stage("load", n_rows):
+            df = read_crawl_file(crawl_csv)
+
+        # Sama dengan `preprocess_text_spam` di notebook, versi vektor
+        with stage("preprocess", n_rows):
+            text = df["full_text"].str.strip()
+            df["processed_text"] = text.where(text.str.len() >= 5)
+            valid_df = df[df["processed_text"].notna()].copy()
+
+        if "dedup" in enabled:
+            with stage("dedup", len(valid_df)):
+                valid_df = assign_clusters(valid_df, text_col="processed_text", threshold=0.8)
+        else:
+            valid_df = valid_df.assign(cluster_id=np.arange(len(valid_df)), cluster_size=1,
+                                       is_representative=True)
+        rep_df = valid_df[valid_df["is_representative"]]
+
+        decisions = None
+        if "prefilter" in enabled:
+            with stage("prefilter", len(rep_df)):
+                decisions = Prefilter(spam_threshold=0.8).decide(rep_df, text_col="processed_text")
+        local_mask = (decisions["prefilter_label"].notna() if decisions is not None
+                      else pd.Series(False, index=rep_df.index))
+        pending = rep_df[~local_mask]
+
+        classification, llm_results = None, []
+        if "classify" in enabled and len(pending):
+            texts = pending["processed_text"].head(config["classify_limit"]).tolist()
+            llm = TimedLLM(HTTPLLM(config["server_url"]))
+            classifier = BatchClassifier(llm, max_workers=config["workers"], rate_per_sec=config["rate"],
+                                         base_delay=0.1, max_delay=2.0, batch_size=config["batch_size"])
+            with stage("classify", len(texts)):
+                llm_results = classifier.classify(texts, progress=False)
+            latencies = np.array(llm.latencies) * 1000
+            classification = {
+                'tweets': len(texts),
+                'tweets_per_sec': stages["classify"]["rows_per_sec"],
+                'calls': classifier.stats['calls'],
+                'retries': classifier.stats['retries'],
+                'errors': classifier.stats['errors'],
+                'latency_p50_ms': round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+                'latency_p99_ms': round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+            }
+
+        # Tweet di atas `classify_limit` memakai hasil LLM yang diulang (disimulasikan)
+        # agar tahap berikutnya tetap memproses dataset ukuran penuh
+        filler = llm_results or [local_result("Not Spam", 0.1, [])]
+        pending_results = llm_results + list(islice(cycle(filler), max(0, len(pending) - len(llm_results))))
+        results = [(tweet_id, result) for tweet_id, result in zip(pending["id_str"], pending_results)]
+        if decisions is not None:
+            decided = decisions[local_mask]
+            results += [(tweet_id, local_result(label, score, indicators))
+                        for tweet_id, label, score, indicators in zip(
+                            rep_df.loc[local_mask, "id_str"], decided["prefilter_label"],
+                            decided["prefilter_score"], decided["prefilter_indicators"])]
+
+        log = ResultLog(os.path.join(workdir, "results.jsonl"))
+        with stage("checkpoint", len(results)):
+            for i, (tweet_id, result) in enumerate(results, 1):
+                log.append(tweet_id, result)
+                if i % 50 == 0:
+                    log.flush()
+            log.flush()
+            results_df = propagate_labels(log.assemble(valid_df), list(RESULT_COLUMNS.values()))
+
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_dir = os.path.join(workdir, "Output", f"deteksi_spam_detail_{run_id}")
+        if "storage" in enabled or "app_load" in enabled:
+            with stage("storage", len(results_df)):
+                write_results(results_df, run_dir)
+
+        if "wordstats" in enabled:
+            with stage("wordstats", len(results_df)):
+                compute_word_stats(iter_frames(results_df))
+
+        if "report" in enabled:
+            with stage("report", len(results_df)):
+                render_markdown(build_report(results_df))
+
+        app = None
+        if "app_load" in enabled:
+            try:
+                from streamlit.testing.v1 import AppTest
+            except ImportError:
+                app = {'skipped': "streamlit tidak terpasang"}
+            else:
+                # Dashboard membaca Output/ relatif terhadap cwd -> run sintetis ini
+                os.chdir(workdir)
+                at = AppTest.from_file(APP_PATH, default_timeout=config["app_timeout"])
+                with stage("app_load", len(results_df)):
+                    at.run()
+                os.chdir(REPO_ROOT)
+                app = {'exceptions': [str(e.value) for e in at.exception]}
+
+        return {
+            'rows': n_rows,
+            'valid_rows': len(valid_df),
+            'representatives': len(rep_df),
+            'prefilter_decided': int(local_mask.sum()),
+            'simulated_results': max(0, len(pending) - len(llm_results)),
+            'stages': stages,
+            'classification': classification,
+            'app': app,
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+        }
+    finally:
+        os.chdir(REPO_ROOT)
+        if not config["keep"]:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metrics(result):
+    """Metrik datar satu hasil: {nama: (nilai, lebih_tinggi_lebih_baik)}."""
+    metrics = {'peak_rss_mb': (result.get("peak_rss_mb"), False)}
+    for name, stage in (result.get("stages") or {}).items():
+        metrics[f"{name}.seconds"] = (stage.get("seconds"), False)
+    for key in COMPARED_METRICS:
+        value = (result.get("classification") or {}).get(key)
+        metrics[f"classify.{key}"] = (value, key in HIGHER_IS_BETTER)
+    return metrics
+
+
+def compare(current, baseline, tolerance=0.10, min_seconds=0.1):
+    """
+    Daftar regresi (string) dibanding baseline, per ukuran dataset yang sama.
+    Selisih durasi tahap di bawah `min_seconds` diabaikan (didominasi noise).
+    """
+    base_by_rows = {r["rows"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        base = base_by_rows.get(result["rows"])
+        if base is None:
+            continue
+        base_metrics = _metrics(base)
+        for name, (value, higher_better) in _metrics(result).items():
+            old = base_metrics.get(name, (None, None))[0]
+            if not value or not old:
+                continue
+            if name.endswith(".seconds") and abs(value - old) < min_seconds:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_better else change
+            if worse > tolerance:
+                regressions.append(f"{result['rows']:>9,} rows  {name:<28} {old:>10.2f} -> {value:>10.2f} "
+                                   f"({change:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    from benchmark.mock_server import MockGraniteServer
+
+    parser = argparse.ArgumentParser(description="Benchmark offline pipeline deteksi spam")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--dup-ratio", type=float, default=0.3, help="porsi tweet identik (retweet)")
+    parser.add_argument("--latency", type=float, default=0.05, help="latensi mock server (detik)")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--rate-limit", type=float, default=None, help="request/detik sebelum 429")
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=100.0, help="rate_per_sec BatchClassifier")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--classify-limit", type=int, default=2000,
+                        help="maks tweet yang benar-benar dikirim ke mock server per ukuran")
+    parser.add_argument("--app-timeout", type=float, default=600)
+    parser.add_argument("--keep", action="store_true", help="jangan hapus direktori kerja")
+    parser.add_argument("-o", "--output", help="tulis JSON ke file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON benchmark sebelumnya untuk cek regresi")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--min-seconds", type=float, default=0.1,
+                        help="abaikan selisih durasi tahap di bawah ini saat cek regresi")
+    args = parser.parse_args(argv)
+
+    server = MockGraniteServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                               rate_limit=args.rate_limit, max_concurrency=args.max_concurrency).start()
+    config = {
+        'stages': args.stages,
+        'dup_ratio': args.dup_ratio,
+        'server_url': server.url,
+        'workers': args.workers,
+        'rate': args.rate,
+        'batch_size': args.batch_size,
+        'classify_limit': args.classify_limit,
+        'app_timeout': args.app_timeout,
+        'keep': args.keep,
+    }
+    results = []
+    try:
+        for n_rows in args.sizes:
+            print(f"⏱️ Benchmark {n_rows:,} baris...", file=sys.stderr)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                results.append(executor.submit(bench_size, n_rows, config).result())
+    finally:
+        server.stop()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'mock_server': {
+                'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                'rate_limit': args.rate_limit, 'max_concurrency': args.max_concurrency,
+                **server.stats,
+            },
+            'config': {k: v for k, v in config.items() if k not in ('server_url', 'keep')},
+        },
+        'results': results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+        print(f"💾 Hasil benchmark disimpan ke '{args.output}'", file=sys.stderr)
+    else:
+        print(payload)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_seconds)
+        if regressions:
+            print(f"🚨 {len(regressions)} regresi (> {args.tolerance:.0%}):", file=sys.stderr)
+            for line in regressions:
+                print("   " + line, file=sys.stderr)
+            return 1
+        print("✅ Tidak ada regresi dibanding baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
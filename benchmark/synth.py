@@ -0,0 +1,45 @@
+"""
+Sintesis dataset crawl berukuran besar dari `Dataset/demoDPR_gabungan.csv`.
+
+Baris diambil acak (dengan pengembalian); sebagian kecil dibiarkan identik
+(meniru retweet/copy-paste, `dup_ratio`). Teks sisanya diganti urutan token acak
+dari korpus asli (distribusi kata dan panjang tweet tetap), sehingga benar-benar
+berbeda: cache maupun dedup MinHash-LSH tidak menggabungkannya dan tahap
+setelah dedup memproses ~`(1 - dup_ratio) * n_rows` baris. `id_str` selalu unik (19 digit).
+"""
+
+import os
+
+import numpy as np
+
+from spam_detection.ingest import read_crawl_file
+
+SOURCE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "Dataset", "demoDPR_gabungan.csv")
+ID_BASE = 1_900_000_000_000_000_000
+
+
+def _random_texts(base_texts, lengths, rng):
+    """Teks berisi `lengths[i]` token yang diambil acak dari seluruh token `base_texts`."""
+    pool = np.array(" ".join(base_texts.tolist()).split(), dtype=object)
+    tokens = pool[rng.integers(0, len(pool), int(lengths.sum()))]
+    return [" ".join(row) for row in np.split(tokens, np.cumsum(lengths)[:-1])]
+
+
+def synthesize(n_rows, source_csv=SOURCE_CSV, dup_ratio=0.3, seed=42):
+    """DataFrame crawl sintetis berisi `n_rows` baris (format kolom sama dengan tweet-harvest)."""
+    base = read_crawl_file(source_csv, parse_dates=False)
+    base = base[base["full_text"].notna()].reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+
+    unique = rng.random(n_rows) >= dup_ratio
+    lengths = df.loc[unique, "full_text"].str.split().str.len().clip(lower=3).to_numpy()
+    df["full_text"] = df["full_text"].astype(object)
+    df.loc[unique, "full_text"] = _random_texts(base["full_text"], lengths, rng)
+    df["full_text"] = df["full_text"].astype("string")
+
+    ids = (ID_BASE + np.arange(n_rows, dtype=np.int64)).astype(str)
+    df["id_str"] = ids
+    df["conversation_id_str"] = ids
+    return df
@@ -0,0 +1,56 @@
+"""
+Modul pendukung pipeline deteksi spam Twitter (IBM Granite).
+
+Notebook `Code/Analisis_Sentimen.ipynb` dan dashboard `app.py` memakai modul-modul
+di paket ini agar logika klasifikasi bisa diimpor, diuji offline, dan diskalakan.
+"""
+
+from .classifier import (
+    PROMPT_VERSION,
+    BATCH_PROMPT_VERSION,
+    build_prompt,
+    build_batch_prompt,
+    parse_response,
+    parse_batch_response,
+    classify_batch,
+    classify_spam_with_explanation,
+)
+from .batch import TokenBucket, BatchClassifier
+from .backends import StubLLM, LocalLLM, make_llm
+from .cache import LLMCache
+from .checkpoint import ResultLog
+from .dedup import assign_clusters, propagate_labels
+from .prefilter import Prefilter
+from .registry import list_runs, record_artifact
+from .metrics import REGISTRY, MetricsWriter
+from .report import build_report, write_report
+from .wordstats import WordStats, compute_word_stats
+
+__all__ = [
+    "PROMPT_VERSION",
+    "BATCH_PROMPT_VERSION",
+    "build_prompt",
+    "build_batch_prompt",
+    "parse_response",
+    "parse_batch_response",
+    "classify_batch",
+    "classify_spam_with_explanation",
+    "TokenBucket",
+    "BatchClassifier",
+    "StubLLM",
+    "LocalLLM",
+    "make_llm",
+    "LLMCache",
+    "ResultLog",
+    "assign_clusters",
+    "propagate_labels",
+    "Prefilter",
+    "list_runs",
+    "record_artifact",
+    "REGISTRY",
+    "MetricsWriter",
+    "build_report",
+    "write_report",
+    "WordStats",
+    "compute_word_stats",
+]
@@ -0,0 +1,399 @@
+"""
+Backend LLM alternatif untuk pipeline deteksi spam.
+
+Semua backend cukup punya `invoke(prompt) -> str`, antarmuka yang sama dengan
+`langchain_community.llms.Replicate`, dan dibuat lewat `make_llm(nama, ...)`:
+
+- `StubLLM`: LLM tiruan untuk uji throughput offline tanpa API token.
+- `HTTPLLM`: endpoint JSON sederhana (mock server benchmark atau server inference).
+- `LocalLLM`: Granite di CPU (`transformers` atau GGUF via llama.cpp) dengan
+  dynamic batching dan prefix cache untuk instruksi prompt yang sama.
+"""
+
+import copy
+import http.client
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+from .classifier import build_batch_prompt, build_prompt
+from .metrics import REGISTRY
+
+_TWEET_RE = re.compile(r'Tweet: "(.*)"', re.S)
+_BATCH_RE = re.compile(r"^Tweet \(JSON.*?\n(\[.*?\n\])", re.S | re.M)
+_SPAM_HINT_RE = re.compile(r"https?://|gratis|promo|diskon|klik|!!!", re.I)
+
+
+class StubHTTPError(Exception):
+    """Error tiruan dengan `status_code` seperti error HTTP dari provider."""
+
+    def __init__(self, status_code, message=""):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class StubLLM:
+    """
+    LLM lokal tiruan: latensi, error rate, dan batas concurrency bisa diatur.
+    Jawabannya mengikuti format KLASIFIKASI/SKOR/INDIKATOR/ALASAN, atau JSON
+    array untuk prompt batch.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, max_concurrency=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.calls = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def _label(self, text):
+        if _SPAM_HINT_RE.search(text):
+            return {'klasifikasi': "Spam", 'skor': 8, 'indikator': ["1. URL/Link mencurigakan"],
+                    'alasan': "Mengandung link atau kata promosi."}
+        return {'klasifikasi': "Not Spam", 'skor': 7, 'indikator': [], 'alasan': "Percakapan normal."}
+
+    def _respond(self, prompt):
+        batch = _BATCH_RE.search(prompt)
+        if batch:
+            items = json.loads(batch.group(1))
+            return json.dumps([{'id': item['id'], **self._label(item['text'])} for item in items],
+                              ensure_ascii=False)
+        match = _TWEET_RE.search(prompt)
+        text = match.group(1) if match else prompt
+        if _SPAM_HINT_RE.search(text):
+            return ("KLASIFIKASI: Spam\nSKOR: 8\nINDIKATOR: 1, 2\n"
+                    "ALASAN: Mengandung link atau kata promosi.")
+        return ("KLASIFIKASI: Not Spam\nSKOR: 7\nINDIKATOR: -\n"
+                "ALASAN: Percakapan normal.")
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self._active += 1
+            over_limit = self.max_concurrency is not None and self._active > self.max_concurrency
+            fail = self._rng.random() < self.error_rate
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        try:
+            if over_limit:
+                raise StubHTTPError(429, "Too Many Requests")
+            time.sleep(delay)
+            if fail:
+                raise StubHTTPError(503, "Service Unavailable")
+            return self._respond(prompt)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+class BackendHTTPError(Exception):
+    """Error HTTP dari `HTTPLLM`; `status_code` & `retry_after` dibaca oleh BatchClassifier."""
+
+    def __init__(self, status_code, message="", retry_after=None):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class HTTPLLM:
+    """
+    Client `invoke(prompt)` untuk endpoint `POST {"prompt": ...} -> {"output": ...}`.
+    Satu koneksi keep-alive per thread agar overhead koneksi tidak ikut terukur.
+    """
+
+    def __init__(self, url, timeout=60.0, **params):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = parts.path or "/"
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.params = params
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def invoke(self, prompt):
+        body = json.dumps({"prompt": prompt, **self.params}).encode("utf-8")
+        conn = self._connection()
+        try:
+            conn.request("POST", self.path, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            # Koneksi putus: buat ulang di panggilan berikutnya, error diteruskan untuk retry
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.status >= 400:
+            retry = response.getheader("Retry-After")
+            raise BackendHTTPError(response.status, payload.decode("utf-8", "replace")[:200],
+                                   float(retry) if retry else None)
+        output = json.loads(payload)["output"]
+        return "".join(output) if isinstance(output, list) else output
+
+
+# ==========================================
+# BACKEND LOKAL (CPU)
+# ==========================================
+LOCAL_MODEL_ID = "ibm-granite/granite-3.3-2b-instruct"
+_PREFIX_SENTINEL = "<<<TWEET>>>"
+
+
+def shared_prefixes(render=lambda prompt: prompt):
+    """
+    Bagian awal prompt yang sama untuk semua tweet (instruksi + kriteria), untuk
+    prompt tunggal dan prompt batch, setelah diformat dengan `render`.
+    """
+    prompts = [build_prompt(_PREFIX_SENTINEL), build_batch_prompt([(_PREFIX_SENTINEL, "")])]
+    return [render(prompt).split(_PREFIX_SENTINEL)[0] for prompt in prompts]
+
+
+class DynamicBatcher:
+    """
+    Kumpulkan prompt dari banyak thread menjadi batch: worker menunggu paling lama
+    `max_wait` detik setelah request pertama atau sampai `max_batch_size` prompt,
+    lalu memanggil `generate(prompts) -> outputs`. Satu thread worker per fungsi
+    di `generate_fns` (mis. satu per instance model). Antrean dibatasi
+    `max_queue`; `submit` memblok saat penuh.
+    """
+
+    def __init__(self, generate_fns, max_batch_size=8, max_wait=0.02, max_queue=None):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue(maxsize=max_queue or max_batch_size * len(generate_fns) * 4)
+        self._workers = [threading.Thread(target=self._loop, args=(fn,), daemon=True) for fn in generate_fns]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, prompt):
+        future = Future()
+        self._queue.put((prompt, future, time.perf_counter()))
+        return future
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Sinyal berhenti dikembalikan agar worker ini berhenti setelah batch selesai
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self, generate):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            start = time.perf_counter()
+            for _, _, queued_at in batch:
+                REGISTRY.observe('local_queue_wait_seconds', start - queued_at)
+            REGISTRY.inc('local_batches_total')
+            REGISTRY.inc('local_batched_prompts_total', len(batch))
+            try:
+                with REGISTRY.timer('local_generate_seconds'):
+                    outputs = generate([prompt for prompt, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), output in zip(batch, outputs):
+                    future.set_result(output)
+
+    def close(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+
+class TransformersEngine:
+    """
+    Granite via `transformers` di CPU. KV cache untuk prefix bersama dihitung
+    sekali saat load, lalu di-copy ke setiap batch sehingga hanya token tweet
+    (dan sisa instruksi sesudahnya) yang diproses ulang.
+    """
+
+    def __init__(self, model_id=LOCAL_MODEL_ID, max_new_tokens=512, temperature=0.1,
+                 num_threads=None, torch_dtype="auto"):
+        try:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer, DynamicCache
+        except ImportError as e:
+            raise ImportError("Backend 'transformers' butuh paket torch dan transformers") from e
+        self.torch = torch
+        self._cache_cls = DynamicCache
+        torch.set_num_threads(num_threads or os.cpu_count() or 1)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id, padding_side="left")
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=torch_dtype).eval()
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.prefixes = [self._prefix_cache(text) for text in shared_prefixes(self.render)]
+
+    def render(self, prompt):
+        """Format prompt dengan chat template model (jika ada)."""
+        if not self.tokenizer.chat_template:
+            return prompt
+        return self.tokenizer.apply_chat_template([{"role": "user", "content": prompt}],
+                                                  tokenize=False, add_generation_prompt=True)
+
+    def _encode(self, texts):
+        return self.tokenizer(texts, return_tensors="pt", padding=True, add_special_tokens=False)
+
+    def _prefix_cache(self, text):
+        ids = self._encode([text]).input_ids
+        cache = self._cache_cls()
+        with self.torch.inference_mode():
+            self.model(input_ids=ids, past_key_values=cache, use_cache=True)
+        return text, ids, cache
+
+    def _generate(self, texts, prefix):
+        torch = self.torch
+        if prefix is None:
+            enc = self._encode(texts)
+            input_ids, attention_mask, cache = enc.input_ids, enc.attention_mask, None
+        else:
+            # [prefix | padding | sisa prompt]: padding di tengah di-mask, posisi token
+            # dihitung dari attention mask sehingga tetap lanjut dari akhir prefix
+            text, ids, prefix_cache = prefix
+            enc = self._encode([t[len(text):] for t in texts])
+            n = len(texts)
+            input_ids = torch.cat([ids.expand(n, -1), enc.input_ids], dim=1)
+            attention_mask = torch.cat([torch.ones(n, ids.shape[1], dtype=enc.attention_mask.dtype),
+                                        enc.attention_mask], dim=1)
+            cache = copy.deepcopy(prefix_cache)
+            cache.batch_repeat_interleave(n)
+        sampling = {'do_sample': True, 'temperature': self.temperature} if self.temperature > 0 else {'do_sample': False}
+        with torch.inference_mode():
+            output = self.model.generate(input_ids=input_ids, attention_mask=attention_mask,
+                                         past_key_values=cache, max_new_tokens=self.max_new_tokens,
+                                         pad_token_id=self.tokenizer.pad_token_id, **sampling)
+        return self.tokenizer.batch_decode(output[:, input_ids.shape[1]:], skip_special_tokens=True)
+
+    def generate(self, prompts):
+        """Generate satu batch; prompt dikelompokkan per prefix yang cocok."""
+        texts = [self.render(prompt) for prompt in prompts]
+        groups = {}
+        for i, text in enumerate(texts):
+            match = next((j for j, (prefix, _, _) in enumerate(self.prefixes) if text.startswith(prefix)), None)
+            groups.setdefault(match, []).append(i)
+        outputs = [None] * len(texts)
+        for match, positions in groups.items():
+            REGISTRY.inc('local_prefix_cache_total', len(positions), result='miss' if match is None else 'hit')
+            prefix = self.prefixes[match] if match is not None else None
+            for i, output in zip(positions, self._generate([texts[i] for i in positions], prefix)):
+                outputs[i] = output
+        return outputs
+
+
+class LlamaCppEngine:
+    """
+    Model GGUF terkuantisasi via `llama-cpp-python`. Satu instance memproses satu
+    prompt per waktu; llama.cpp memakai ulang KV cache untuk token awal yang sama
+    dengan prompt sebelumnya, jadi instruksi bersama tidak dievaluasi ulang.
+    """
+
+    def __init__(self, model_path, max_new_tokens=512, temperature=0.1, num_threads=None, n_ctx=4096):
+        try:
+            from llama_cpp import Llama
+        except ImportError as e:
+            raise ImportError("Backend 'llama_cpp' butuh paket llama-cpp-python") from e
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=num_threads or os.cpu_count() or 1,
+                         verbose=False)
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+
+    def generate(self, prompts):
+        return [self.llm.create_chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.max_new_tokens,
+            temperature=self.temperature,
+        )["choices"][0]["message"]["content"] for prompt in prompts]
+
+
+class LocalLLM:
+    """
+    Backend `invoke(prompt)` untuk model lokal. Panggilan paralel dari
+    BatchClassifier dikumpulkan `DynamicBatcher` menjadi batch per engine.
+    """
+
+    def __init__(self, engines, max_batch_size=8, max_wait=0.02):
+        self.engines = list(engines)
+        self.batcher = DynamicBatcher([engine.generate for engine in self.engines],
+                                      max_batch_size=max_batch_size, max_wait=max_wait)
+
+    def invoke(self, prompt):
+        return self.batcher.submit(prompt).result()
+
+    def close(self):
+        self.batcher.close()
+
+
+def local_granite(engine="transformers", model=LOCAL_MODEL_ID, workers=None, max_batch_size=None,
+                  max_wait=0.02, **engine_kwargs):
+    """
+    Buat `LocalLLM` dengan pool worker sesuai jumlah core CPU.
+
+    - `transformers`: default 1 instance (matmul torch sudah memakai semua core,
+      instance tambahan hanya menggandakan RAM), batch hingga 8 prompt.
+    - `llama_cpp`: `model` = path file GGUF; default satu instance per 4 core,
+      masing-masing memproses satu prompt per waktu.
+    """
+    cores = os.cpu_count() or 1
+    if engine == "transformers":
+        engine_cls, workers, max_batch_size = TransformersEngine, workers or 1, max_batch_size or 8
+    elif engine == "llama_cpp":
+        engine_cls, workers, max_batch_size = LlamaCppEngine, workers or max(1, cores // 4), max_batch_size or 1
+    else:
+        raise ValueError(f"Engine lokal tidak dikenal: {engine!r}")
+    engine_kwargs.setdefault("num_threads", max(1, cores // workers))
+    engines = [engine_cls(model, **engine_kwargs) for _ in range(workers)]
+    return LocalLLM(engines, max_batch_size=max_batch_size, max_wait=max_wait)
+
+
+def _replicate(model, api_token=None, **model_kwargs):
+    from langchain_community.llms import Replicate
+    return Replicate(model=model, model_kwargs=model_kwargs, replicate_api_token=api_token)
+
+
+BACKENDS = {
+    'replicate': _replicate,
+    'transformers': lambda **kwargs: local_granite("transformers", **kwargs),
+    'llama_cpp': lambda **kwargs: local_granite("llama_cpp", **kwargs),
+    'http': HTTPLLM,
+    'stub': StubLLM,
+}
+
+
+def make_llm(backend, **kwargs):
+    """Buat backend LLM dari nama di `BACKENDS` (argumen diteruskan ke konstruktornya)."""
+    try:
+        factory = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Backend tidak dikenal: {backend!r} (pilihan: {', '.join(BACKENDS)})") from None
+    return factory(**kwargs)
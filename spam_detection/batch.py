@@ -0,0 +1,239 @@
+"""
+Batch classifier dengan konkurensi terbatas, token-bucket rate limiter, dan
+adaptive backoff untuk error 429/5xx.
+
+Pengganti loop serial `valid_df.itertuples()` + `time.sleep(1.5)` di notebook.
+Hasil selalu dikembalikan sesuai urutan input sehingga bisa langsung ditempel
+ke `results_df`.
+"""
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from .classifier import classify_batch, classify_tweet, error_result
+from .metrics import REGISTRY, error_type
+
+try:
+    from tqdm import tqdm
+except ImportError:  # tqdm opsional, hanya untuk progress bar
+    tqdm = None
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+_RETRYABLE_MSG_RE = re.compile(r"\b(429|5\d\d)\b|rate.?limit|throttl|too many requests|timed? ?out", re.I)
+# Detail error yang disimpan di `BatchClassifier.errors` (service berjalan terus-menerus)
+MAX_ERRORS = 1000
+
+
+def error_status(exc):
+    """Ambil HTTP status code dari exception (replicate, httpx, requests, stub)."""
+    for attr in ("status_code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(exc):
+    """True jika error bersifat sementara (rate limit / server error / timeout)."""
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return bool(_RETRYABLE_MSG_RE.search(str(exc)))
+
+
+def retry_after(exc):
+    """Baca header Retry-After (detik) jika provider mengirimkannya."""
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter thread-safe dengan laju adaptif (AIMD):
+    laju dipotong saat provider menolak (429/5xx) dan naik perlahan saat sukses.
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=None):
+        if rate <= 0:
+            raise ValueError("rate harus > 0")
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 20
+        self.capacity = float(capacity) if capacity else max(1.0, self.max_rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Blok sampai token tersedia. Lama menunggu dicatat ke `rate_limit_wait_seconds`."""
+        start = time.perf_counter()
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                wait_s = (tokens - self._tokens) / self.rate
+            time.sleep(wait_s)
+        REGISTRY.observe('rate_limit_wait_seconds', time.perf_counter() - start)
+
+    def slow_down(self, factor=0.5):
+        """Multiplicative decrease setelah provider menolak request."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * factor)
+
+    def speed_up(self, step=None):
+        """Additive increase setelah request sukses."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + (step or self.max_rate * 0.05))
+
+
+class BatchClassifier:
+    """
+    Klasifikasi banyak tweet secara paralel (thread pool) dengan rate limit.
+
+    `llm` cukup punya method `invoke(prompt) -> str` (Replicate LangChain,
+    StubLLM, atau backend lain). `classify_fn(text, llm)` bisa diganti untuk
+    menyisipkan cache/prefilter. Dengan `batch_size > 1`, beberapa tweet
+    dikemas dalam satu prompt JSON lewat `batch_fn(texts, llm)`; item yang
+    jawabannya tidak valid (None) dikirim ulang dengan `classify_fn` sebagai
+    tugas biasa, sehingga tetap melewati rate limiter dan retry.
+    `errors` hanya menyimpan `max_errors` error terakhir; jumlah totalnya
+    ada di `stats['errors']`.
+    """
+
+    def __init__(self, llm, max_workers=8, rate_per_sec=5.0, burst=None,
+                 max_retries=5, base_delay=1.0, max_delay=60.0,
+                 classify_fn=classify_tweet, batch_size=1, batch_fn=classify_batch,
+                 max_errors=MAX_ERRORS):
+        self.llm = llm
+        self.max_workers = max_workers
+        self.limiter = TokenBucket(rate_per_sec, capacity=burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.classify_fn = classify_fn
+        self.batch_size = batch_size
+        self.batch_fn = batch_fn
+        self.errors = deque(maxlen=max_errors)
+        self.stats = {'calls': 0, 'retries': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _call(self, texts, single=False):
+        if self.batch_size > 1 and not single:
+            return self.batch_fn(texts, self.llm)
+        return [self.classify_fn(texts[0], self.llm)]
+
+    def _classify_with_retry(self, texts, single=False):
+        """Panggil LLM dengan exponential backoff + jitter untuk error sementara."""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            self._count('calls')
+            try:
+                result = self._call(texts, single)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self._count('retries')
+                REGISTRY.inc('llm_retries_total', type=error_type(e, error_status(e)))
+                self.limiter.slow_down()
+                delay = retry_after(e)
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                REGISTRY.observe('backoff_sleep_seconds', delay)
+                time.sleep(delay)
+            else:
+                self.limiter.speed_up()
+                return result
+
+    def _record_error(self, index, error):
+        self._count('errors')
+        REGISTRY.inc('llm_errors_total', type=error_type(error, error_status(error)))
+        self.errors.append({
+            'tweet_index': index,
+            'error': str(error),
+            'timestamp': datetime.now().isoformat()
+        })
+        return error_result(error)
+
+    def iter_classify(self, texts):
+        """
+        Generator (index, result) sesuai urutan selesai. Jumlah future yang
+        berjalan dibatasi sehingga memori tetap konstan untuk input besar.
+        """
+        window = self.max_workers * 4
+        chunks = self._chunks(texts)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < window:
+                    try:
+                        indices, chunk = next(chunks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[executor.submit(self._classify_with_retry, chunk)] = (indices, chunk)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indices, chunk = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        results = [self._record_error(index, e) for index in indices]
+                    for index, text, result in zip(indices, chunk, results):
+                        if result is None:
+                            # Jawaban batch tidak valid: ulang dengan prompt tunggal
+                            REGISTRY.inc('batch_item_resubmits_total')
+                            pending[executor.submit(self._classify_with_retry, [text], True)] = ([index], [text])
+                            continue
+                        REGISTRY.inc('tweets_classified_total', classification=result['classification'])
+                        yield index, result
+
+    def _chunks(self, texts):
+        """Generator (list index, list teks) berukuran `batch_size`."""
+        indices, chunk = [], []
+        for index, text in enumerate(texts):
+            indices.append(index)
+            chunk.append(text)
+            if len(chunk) == self.batch_size:
+                yield indices, chunk
+                indices, chunk = [], []
+        if chunk:
+            yield indices, chunk
+
+    def classify(self, texts, progress=True):
+        """Klasifikasi semua teks dan kembalikan list hasil sesuai urutan input."""
+        texts = list(texts)
+        results = [None] * len(texts)
+        bar = tqdm(total=len(texts), desc="Deteksi Spam") if progress and tqdm else None
+        for index, result in self.iter_classify(texts):
+            results[index] = result
+            if bar is not None:
+                bar.update(1)
+        if bar is not None:
+            bar.close()
+        return results
@@ -0,0 +1,208 @@
+"""
+Cache jawaban LLM berbasis SQLite (content-addressed).
+
+Kunci cache = hash dari teks ternormalisasi + versi prompt + model id +
+`model_kwargs`, sehingga tweet duplikat/retweet dan re-run notebook tidak
+memanggil Granite dua kali.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from .classifier import BATCH_PROMPT_VERSION, PROMPT_VERSION
+from .metrics import REGISTRY
+
+# Jumlah update `last_access` yang dikumpulkan sebelum ditulis dalam satu transaksi
+TOUCH_BATCH = 256
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_WS_RE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    classification TEXT,
+    confidence_score INTEGER,
+    indicators TEXT,
+    reason TEXT,
+    full_response TEXT,
+    created_at REAL,
+    last_access REAL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access);
+"""
+
+
+def normalize_text(text):
+    """
+    Normalisasi teks untuk kunci cache: NFKC, URL diganti placeholder
+    (link t.co berbeda tapi isi sama), whitespace dirapikan. Huruf besar
+    dipertahankan karena ALL CAPS adalah indikator spam.
+    """
+    text = unicodedata.normalize("NFKC", str(text))
+    text = _URL_RE.sub("<URL>", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def make_key(text, model_id, model_kwargs=None, prompt_version=PROMPT_VERSION):
+    """Kunci cache SHA-256 untuk kombinasi teks, prompt, dan konfigurasi model."""
+    payload = json.dumps(
+        [normalize_text(text), prompt_version, model_id, model_kwargs or {}],
+        sort_keys=True, ensure_ascii=False,
+    )
+    # surrogatepass: tweet dengan surrogate tunggal tetap punya kunci (teks valid tidak berubah)
+    return hashlib.sha256(payload.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def _cacheable(result):
+    """Hasil error atau tebakan default parser tidak disimpan (bisa sukses saat dicoba lagi)."""
+    return not (result.get('error') or result.get('fallback'))
+
+
+class LLMCache:
+    """
+    Cache persisten di file SQLite dengan eviction berdasarkan umur
+    (`max_age`, detik) dan jumlah entri (`max_entries`, LRU).
+    """
+
+    def __init__(self, path, model_id, model_kwargs=None, max_entries=None,
+                 max_age=None, prompt_version=PROMPT_VERSION):
+        self.path = path
+        self.model_id = model_id
+        self.model_kwargs = model_kwargs or {}
+        self.prompt_version = prompt_version
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> waktu akses terakhir yang belum ditulis
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def key(self, text, prompt_version=None):
+        return make_key(text, self.model_id, self.model_kwargs, prompt_version or self.prompt_version)
+
+    def get(self, text, prompt_version=None):
+        """Ambil hasil dari cache, atau None jika tidak ada / kadaluarsa."""
+        key = self.key(text, prompt_version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT classification, confidence_score, indicators, reason, full_response, created_at "
+                "FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.max_age and now - row[5] > self.max_age):
+                self.misses += 1
+                REGISTRY.inc('cache_requests_total', result='miss')
+                return None
+            self.hits += 1
+            REGISTRY.inc('cache_requests_total', result='hit')
+            # Ditunda dan ditulis per batch: UPDATE langsung membuka transaksi tulis yang
+            # mengunci file untuk proses lain sampai commit berikutnya
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touches()
+        return {
+            'classification': row[0],
+            'confidence_score': row[1],
+            'indicators': json.loads(row[2]),
+            'reason': row[3],
+            'full_response': row[4]
+        }
+
+    def _write_touches(self):
+        """Tulis `last_access` yang tertunda lalu commit (dipanggil dengan lock dipegang)."""
+        if self._touched:
+            self._conn.executemany("UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                                   [(t, key) for key, t in self._touched.items()])
+            self._touched.clear()
+        self._conn.commit()
+
+    def put(self, text, result, prompt_version=None):
+        """Simpan hasil klasifikasi (full_response + field hasil parse)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(text, prompt_version), result['classification'], int(result['confidence_score']),
+                 json.dumps(result['indicators'], ensure_ascii=False), result['reason'],
+                 result.get('full_response', ""), now, now),
+            )
+            self._write_touches()
+
+    def evict(self):
+        """Hapus entri kadaluarsa dan entri paling lama tidak dipakai. Return jumlah terhapus."""
+        removed = 0
+        with self._lock:
+            self._write_touches()  # urutan LRU memakai akses terbaru
+            if self.max_age:
+                cur = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?",
+                                         (time.time() - self.max_age,))
+                removed += cur.rowcount
+            if self.max_entries:
+                cur = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache "
+                    "ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                )
+                removed += cur.rowcount
+            self._conn.commit()
+        return removed
+
+    def wrap(self, classify_fn, prompt_version=PROMPT_VERSION):
+        """
+        Bungkus `classify_fn(text, llm)` (prompt tunggal) agar cek cache dulu. Hanya
+        hasil sukses yang disimpan (bukan error/fallback parser); exception tetap
+        diteruskan ke pemanggil untuk retry.
+        """
+        def cached_classify(text, llm):
+            result = self.get(text, prompt_version)
+            if result is None:
+                result = classify_fn(text, llm)
+                if _cacheable(result):
+                    self.put(text, result, prompt_version)
+            return result
+        return cached_classify
+
+    def wrap_batch(self, batch_fn, prompt_version=BATCH_PROMPT_VERSION):
+        """
+        Versi `wrap` untuk `batch_fn(texts, llm)`: hanya teks yang miss dikirim ke LLM.
+        Item None (jawaban batch tidak valid) diteruskan tanpa disimpan.
+        """
+        def cached_batch(texts, llm):
+            results = [self.get(text, prompt_version) for text in texts]
+            missing = [i for i, result in enumerate(results) if result is None]
+            if missing:
+                fresh = batch_fn([texts[i] for i in missing], llm)
+                for i, result in zip(missing, fresh):
+                    results[i] = result
+                    if result is not None and _cacheable(result):
+                        self.put(texts[i], result, prompt_version)
+            return results
+        return cached_batch
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def stats(self):
+        """Statistik hit/miss sejak cache dibuka."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self),
+        }
+
+    def close(self):
+        with self._lock:
+            self._write_touches()
+            self._conn.close()
@@ -0,0 +1,114 @@
+"""
+Write-ahead log hasil deteksi spam (JSONL append-only) dengan mode resume.
+
+Menggantikan `checkpoint_spam_detail_{i}.csv` yang menulis ulang seluruh hasil
+setiap 500 tweet. Setiap batch hasil cukup di-append ke log; saat run crash,
+tweet yang id-nya sudah ada di log dilewati.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from .metrics import REGISTRY
+
+RESULT_COLUMNS = {
+    'classification': 'spam_classification',
+    'confidence_score': 'confidence_score',
+    'indicators': 'spam_indicators',
+    'reason': 'spam_reason',
+    'full_response': 'full_analysis',
+}
+
+
+class ResultLog:
+    """Log hasil klasifikasi per tweet (satu baris JSON per tweet, dikunci `id_str`)."""
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self._buffer = []
+        self._tail_checked = False
+
+    def completed_ids(self, retry_errors=True):
+        """Set id tweet yang sudah tercatat di log (tanpa hasil error jika `retry_errors`)."""
+        ids = set()
+        if not os.path.exists(self.path):
+            return ids
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    continue
+                if retry_errors and record.get('error'):
+                    ids.discard(record['id'])
+                else:
+                    ids.add(record['id'])
+        return ids
+
+    def append(self, tweet_id, result):
+        """Tambahkan satu hasil ke buffer (ditulis saat `flush`)."""
+        record = {'id': str(tweet_id)}
+        record.update({key: result.get(key) for key in RESULT_COLUMNS})
+        record['error'] = bool(result.get('error', False))
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+
+    def _truncated_tail(self):
+        """True jika baris terakhir log terpotong (file tidak diakhiri newline)."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except OSError:
+            # File belum ada atau masih kosong
+            return False
+
+    def flush(self):
+        """Tulis buffer ke akhir file sekaligus (satu write per batch)."""
+        if not self._buffer:
+            return 0
+        count = len(self._buffer)
+        # Setelah crash baris terakhir bisa terpotong; mulai di baris baru agar
+        # record pertama hasil resume tidak tergabung dengan baris rusak itu
+        prefix = "\n" if not self._tail_checked and self._truncated_tail() else ""
+        self._tail_checked = True
+        with REGISTRY.timer('checkpoint_flush_seconds'):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(prefix + "\n".join(self._buffer) + "\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        REGISTRY.inc('checkpoint_records_total', count)
+        self._buffer = []
+        return count
+
+    def read(self):
+        """Baca seluruh log sebagai DataFrame (hasil terakhir per id yang dipakai)."""
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=['id', *RESULT_COLUMNS])
+        records = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        log_df = pd.DataFrame.from_records(records, columns=['id', *RESULT_COLUMNS])
+        return log_df.drop_duplicates(subset='id', keep='last')
+
+    def assemble(self, valid_df, id_col='id_str'):
+        """
+        Gabungkan log dengan `valid_df` dalam satu join vektor. Urutan baris
+        mengikuti `valid_df`; tweet yang belum ada di log bernilai NaN.
+        """
+        log_df = self.read().rename(columns=RESULT_COLUMNS)
+        log_df['spam_indicators'] = log_df['spam_indicators'].map(str)
+        keys = valid_df[id_col].astype(str)
+        log_df = log_df.set_index('id').reindex(keys.to_numpy())
+        results_df = valid_df.copy()
+        for column in RESULT_COLUMNS.values():
+            results_df[column] = log_df[column].to_numpy()
+        return results_df
@@ -0,0 +1,242 @@
+"""
+Prompt dan parser klasifikasi spam dengan IBM Granite.
+
+Isi fungsi diambil dari sel "Function Untuk Deteksi" di notebook supaya bisa
+dipakai ulang oleh batch classifier, cache, dan dashboard.
+"""
+
+import json
+import re
+import textwrap
+
+from .metrics import REGISTRY, count_tokens, error_type
+
+# Naikkan versi ini setiap kali template prompt berubah (dipakai sebagai kunci cache)
+PROMPT_VERSION = "v1"
+BATCH_PROMPT_VERSION = "batch-v1"
+
+SPAM_CRITERIA = """KRITERIA SPAM:
+1. URL/Link mencurigakan (bit.ly, tinyurl, link pendek tanpa konteks)
+2. Promosi berlebihan (kata-kata seperti "GRATIS!", "MENANG!", "KLIK SEKARANG!")
+3. Excessive punctuation (!!!, ???, banyak emoji berlebihan)
+4. ALL CAPS atau mixed case berlebihan
+5. Meminta informasi pribadi (password, PIN, data bank)
+6. Penawaran terlalu bagus untuk menjadi kenyataan
+7. Konten duplikat/template yang sama
+8. Clickbait extreme ("WAJIB TAHU!", "RAHASIA INI...")
+9. Promosi tanpa konteks yang relevan
+10. Mengandung kata spam umum (MLM, investasi instan, dll)
+
+KRITERIA NOT SPAM:
+1. Percakapan normal/diskusi
+2. Sharing berita/informasi faktual
+3. Opini pribadi yang wajar
+4. Interaksi sosial normal
+5. Konten edukatif
+6. Update status personal"""
+
+# Sama persis dengan prompt di notebook asli (termasuk indentasinya), supaya
+# jawaban model dan entri cache "v1" tetap sebanding dengan run sebelumnya
+PROMPT_TEMPLATE = """
+        Tugas: Analisis tweet berikut dan klasifikasikan apakah ini spam atau bukan. Berikan penjelasan detail mengapa.
+
+{criteria}
+
+        Tweet: "{text}"
+
+        ANALISIS:
+        1. Klasifikasi: [Spam] atau [Not Spam]
+        2. Skor kepercayaan: [1-10]
+        3. Indikator yang ditemukan: [sebutkan indikator spesifik]
+        4. Alasan: [penjelasan detail mengapa diklasifikasikan demikian]
+
+        Format jawaban:
+        KLASIFIKASI: [Spam/Not Spam]
+        SKOR: [1-10]
+        INDIKATOR: [daftar indikator yang ditemukan]
+        ALASAN: [penjelasan detail]
+        """
+_PROMPT_INDENT = " " * 8
+
+BATCH_PROMPT_TEMPLATE = """Tugas: Klasifikasikan SETIAP tweet di bawah ini sebagai spam atau bukan, dengan penjelasan singkat.
+
+{criteria}
+
+Tweet (JSON, setiap tweet punya "id"):
+{tweets_json}
+
+Jawab HANYA dengan JSON array, satu objek per tweet dengan id yang sama, tanpa teks lain:
+[{{"id": "<id>", "klasifikasi": "Spam" atau "Not Spam", "skor": <1-10>, "indikator": ["<nomor dan nama kriteria>", ...], "alasan": "<penjelasan>"}}]
+"""
+
+_SCORE_RE = re.compile(r"\d+")
+_LABELS = {"spam": "Spam", "not spam": "Not Spam"}
+
+
+def build_prompt(text):
+    """Bangun prompt klasifikasi untuk satu tweet."""
+    return PROMPT_TEMPLATE.format(criteria=textwrap.indent(SPAM_CRITERIA, _PROMPT_INDENT), text=text)
+
+
+def default_result(reason="Tidak ada alasan spesifik", response=""):
+    """Hasil default ketika jawaban model tidak bisa diparse."""
+    return {
+        'classification': "Not Spam",
+        'confidence_score': 5,
+        'indicators': [],
+        'reason': reason,
+        'full_response': response
+    }
+
+
+def error_result(error):
+    """Hasil default untuk tweet yang gagal dianalisis (format sama dengan notebook)."""
+    return {
+        'classification': "Not Spam",
+        'confidence_score': 1,
+        'indicators': ["Error dalam analisis"],
+        'reason': f"Error: {str(error)}",
+        'full_response': "",
+        'error': True
+    }
+
+
+def parse_response(response):
+    """
+    Parse jawaban teks bebas (KLASIFIKASI/SKOR/INDIKATOR/ALASAN) menjadi dict hasil
+    """
+    response = response.strip()
+    result = default_result(response=response)
+    parsed_score = False
+
+    # Extract classification
+    if "KLASIFIKASI:" in response:
+        klasifikasi_line = response.split("KLASIFIKASI:")[1].split("\n")[0].strip()
+        if "SPAM" in klasifikasi_line.upper() and "NOT SPAM" not in klasifikasi_line.upper():
+            result['classification'] = "Spam"
+
+    # Extract confidence score
+    if "SKOR:" in response:
+        skor_line = response.split("SKOR:")[1].split("\n")[0].strip()
+        match = _SCORE_RE.search(skor_line)
+        if match:
+            result['confidence_score'] = int(match.group())
+            parsed_score = True
+
+    # Extract indicators
+    if "INDIKATOR:" in response:
+        indikator_line = response.split("INDIKATOR:")[1].split("ALASAN:")[0].strip()
+        result['indicators'] = [indikator_line]
+
+    # Extract reason
+    if "ALASAN:" in response:
+        result['reason'] = response.split("ALASAN:")[1].strip()
+
+    # Tanpa KLASIFIKASI/SKOR hasilnya hanya tebakan default: ditandai agar tidak di-cache
+    if "KLASIFIKASI:" not in response or not parsed_score:
+        result['fallback'] = True
+        REGISTRY.inc('parse_invalid_total')
+
+    return result
+
+
+def classify_tweet(text, llm):
+    """
+    Klasifikasi satu tweet. Exception dari LLM tidak ditangkap agar pemanggil
+    (mis. BatchClassifier) bisa melakukan retry/backoff.
+    """
+    prompt = build_prompt(text)
+    with REGISTRY.timer('llm_request_seconds', mode='single'):
+        response = llm.invoke(prompt)
+    count_tokens(prompt, response)
+    with REGISTRY.timer('parse_seconds', format='text'):
+        return parse_response(response)
+
+
+def build_batch_prompt(items):
+    """
+    Bangun satu prompt untuk banyak tweet; `items` = list (id, text).
+    Kriteria hanya dikirim sekali sehingga token instruksi teramortisasi.
+    """
+    lines = (json.dumps({'id': str(i), 'text': t}, ensure_ascii=False) for i, t in items)
+    tweets_json = "[\n" + ",\n".join(lines) + "\n]"
+    return BATCH_PROMPT_TEMPLATE.format(criteria=SPAM_CRITERIA, tweets_json=tweets_json)
+
+
+def _validate_item(item):
+    """Ubah satu objek JSON jawaban menjadi dict hasil, atau None jika tidak valid."""
+    if not isinstance(item, dict):
+        return None
+    label = _LABELS.get(str(item.get('klasifikasi', '')).strip().lower())
+    score = item.get('skor')
+    if isinstance(score, str) and score.strip().isdigit():
+        score = int(score)
+    indicators = item.get('indikator', [])
+    if isinstance(indicators, str):
+        indicators = [indicators]
+    reason = item.get('alasan')
+    if (label is None or isinstance(score, bool) or not isinstance(score, int) or not 1 <= score <= 10
+            or not isinstance(indicators, list) or not isinstance(reason, str)):
+        return None
+    return {
+        'classification': label,
+        'confidence_score': score,
+        'indicators': [str(x) for x in indicators],
+        'reason': reason.strip(),
+        'full_response': json.dumps(item, ensure_ascii=False)
+    }
+
+
+def parse_batch_response(response, ids):
+    """
+    Parse jawaban JSON array untuk prompt batch. Return (hasil per id, id yang
+    hilang/tidak valid). Tidak ada fallback diam-diam ke "Not Spam".
+    """
+    ids = [str(i) for i in ids]
+    start, end = response.find("["), response.rfind("]")
+    try:
+        items = json.loads(response[start:end + 1]) if start != -1 and end > start else None
+    except ValueError:
+        items = None
+    results = {}
+    if isinstance(items, list):
+        wanted = set(ids)
+        for item in items:
+            item_id = str(item.get('id')) if isinstance(item, dict) else None
+            if item_id in wanted and item_id not in results:
+                parsed = _validate_item(item)
+                if parsed is not None:
+                    results[item_id] = parsed
+    invalid = [i for i in ids if i not in results]
+    return results, invalid
+
+
+def classify_batch(texts, llm):
+    """
+    Klasifikasi beberapa tweet dengan satu panggilan LLM. Item yang jawabannya
+    tidak valid dikembalikan sebagai None; BatchClassifier mengirim ulang item
+    tersebut dengan prompt tunggal lewat rate limiter & retry. Exception dari
+    panggilan batch diteruskan agar bisa di-retry oleh BatchClassifier.
+    """
+    ids = [f"t{i}" for i in range(len(texts))]
+    prompt = build_batch_prompt(list(zip(ids, texts)))
+    with REGISTRY.timer('llm_request_seconds', mode='batch'):
+        response = llm.invoke(prompt)
+    count_tokens(prompt, response)
+    with REGISTRY.timer('parse_seconds', format='json'):
+        parsed, invalid = parse_batch_response(response, ids)
+    if invalid:
+        REGISTRY.inc('parse_invalid_total', len(invalid))
+    return [parsed.get(i) for i in ids]
+
+
+def classify_spam_with_explanation(text, llm):
+    """
+    Function untuk klasifikasi spam dengan penjelasan detail
+    """
+    try:
+        return classify_tweet(text, llm)
+    except Exception as e:
+        REGISTRY.inc('llm_errors_total', type=error_type(e))
+        print(f"Error dalam classify_spam_with_explanation: {e}")
+        return error_result(e)
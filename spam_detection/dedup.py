@@ -0,0 +1,194 @@
+"""
+Clustering near-duplicate / template tweet dengan MinHash + LSH.
+
+Spam kampanye (arhan, azizah, salsha, shopeepay, ...) biasanya template yang
+sama dengan link t.co berbeda sehingga lolos `drop_duplicates(subset=["full_text"])`.
+Modul ini mengelompokkan tweet mirip tanpa perbandingan berpasangan, sehingga
+cukup satu perwakilan per cluster yang dikirim ke Granite.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_NON_WORD_RE = re.compile(r"[^\w\s]|_")
+_WS_RE = re.compile(r"\s+")
+
+_SHINGLE_BASE = np.uint64(1000003)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize_for_dedup(text):
+    """Lowercase, buang URL, mention, dan tanda baca; rapikan whitespace."""
+    if pd.isna(text):
+        return ""
+    text = str(text).lower()
+    text = _URL_RE.sub(" ", text)
+    text = _MENTION_RE.sub(" ", text)
+    text = _NON_WORD_RE.sub(" ", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+class MinHashLSH:
+    """
+    Index MinHash-LSH incremental. `threshold` adalah estimasi Jaccard minimum
+    (shingle karakter) agar dua tweet dianggap satu cluster.
+
+    Signature dihitung per chunk (vektor NumPy) dan hanya disimpan untuk
+    dokumen yang menjadi anggota pertama suatu bucket, karena verifikasi
+    kandidat selalu terhadap anggota pertama itu.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle_size=5, seed=42, chunk_size=64):
+        if num_perm % bands:
+            raise ValueError("num_perm harus habis dibagi bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Permutasi a*h + b mod 2^32 (a ganjil): aritmetika uint32 yang overflow-nya disengaja
+        self._a = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64).astype(np.uint32)
+        self.chunk_size = chunk_size
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+        self._parent = []
+
+    def _shingle_hashes(self, texts):
+        """
+        Hash 32-bit semua shingle karakter `texts` (digabung) dan offset awal
+        tiap teks. Teks yang lebih pendek dari `shingle_size` menjadi satu shingle.
+        """
+        k = self.shingle_size
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        ends = np.cumsum(lengths)
+        counts = np.maximum(lengths - k + 1, 1)
+        offsets = np.cumsum(counts) - counts
+        # Posisi awal setiap shingle di array kode karakter gabungan
+        pos = np.arange(counts.sum()) + np.repeat(ends - lengths - offsets, counts)
+        end = np.repeat(ends, counts)
+        # surrogatepass: surrogate tunggal (emoji terpotong dari JSON) tetap satu kode per karakter
+        codes = np.frombuffer("".join(texts).encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32)
+        codes = np.concatenate([codes.astype(np.uint64), np.zeros(k, dtype=np.uint64)])
+        hashes = np.zeros(len(pos), dtype=np.uint64)
+        for j in range(k):
+            hashes = hashes * _SHINGLE_BASE + np.where(pos + j < end, codes[pos + j], 0)
+        hashes ^= hashes >> np.uint64(31)
+        hashes *= _MIX
+        hashes ^= hashes >> np.uint64(32)
+        return hashes.astype(np.uint32), offsets
+
+    def signatures(self, texts):
+        """Signature MinHash (n, num_perm) uint32 dari banyak teks ternormalisasi, dihitung per chunk."""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), self.chunk_size):
+            chunk = texts[start:start + self.chunk_size]
+            hashes, offsets = self._shingle_hashes(chunk)
+            permuted = np.multiply.outer(self._a, hashes)
+            permuted += self._b[:, None]
+            out[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return out
+
+    def signature(self, text):
+        """Signature MinHash dari shingle karakter teks ternormalisasi."""
+        return self.signatures([text])[0]
+
+    def _find(self, i):
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def add_many(self, texts):
+        """Tambahkan banyak teks ternormalisasi (urutan dipertahankan); return range index dokumen."""
+        first_id = len(self._parent)
+        min_equal = self.threshold * self.num_perm
+        for start in range(0, len(texts), self.chunk_size):
+            sigs = self.signatures(texts[start:start + self.chunk_size])
+            # Kunci bucket = bytes dari potongan signature per band
+            keys = sigs.reshape(len(sigs), self.bands, self.rows).view(f"V{4 * self.rows}")
+            for sig, doc_keys in zip(sigs, keys.reshape(len(sigs), self.bands).tolist()):
+                doc_id = len(self._parent)
+                self._parent.append(doc_id)
+                checked = set()
+                for buckets, key in zip(self._buckets, doc_keys):
+                    first = buckets.setdefault(key, doc_id)
+                    if first == doc_id:
+                        if doc_id not in self._signatures:
+                            self._signatures[doc_id] = sig.copy()
+                        continue
+                    if first in checked:
+                        continue
+                    checked.add(first)
+                    # Verifikasi kandidat terhadap anggota pertama bucket saja (tetap linear)
+                    if np.count_nonzero(self._signatures[first] == sig) >= min_equal:
+                        root_a, root_b = self._find(first), self._find(doc_id)
+                        if root_a != root_b:
+                            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+        return range(first_id, len(self._parent))
+
+    def add(self, text):
+        """Tambahkan teks ternormalisasi; return index dokumen."""
+        return self.add_many([text])[0]
+
+    def labels(self):
+        """Label cluster per dokumen (= index dokumen pertama di cluster)."""
+        return np.array([self._find(i) for i in range(len(self._parent))], dtype=np.int64)
+
+
+def cluster_near_duplicates(texts, threshold=0.8, num_perm=128, bands=16, min_length=10):
+    """
+    Cluster id untuk setiap teks (urutan sama dengan input). Teks identik
+    setelah normalisasi langsung digabung; teks yang terlalu pendek setelah
+    normalisasi (mis. tweet berisi link saja) hanya digabung jika identik.
+    """
+    normalized = [normalize_for_dedup(t) for t in texts]
+    lsh = MinHashLSH(threshold=threshold, num_perm=num_perm, bands=bands)
+    exact = {}
+    lsh_docs = []
+    cluster_ids = np.arange(len(normalized), dtype=np.int64)
+    for i, text in enumerate(normalized):
+        if not text:
+            continue
+        if text in exact:
+            cluster_ids[i] = exact[text]
+            continue
+        exact[text] = i
+        if len(text) >= min_length:
+            lsh_docs.append(i)
+    if lsh_docs:
+        lsh.add_many([normalized[i] for i in lsh_docs])
+        lsh_docs = np.asarray(lsh_docs)
+        lsh_labels = lsh_docs[lsh.labels()]
+        remap = np.arange(len(normalized), dtype=np.int64)
+        remap[lsh_docs] = lsh_labels
+        cluster_ids = remap[cluster_ids]
+    return cluster_ids
+
+
+def assign_clusters(df, text_col='processed_text', threshold=0.8, **kwargs):
+    """
+    Tambahkan kolom `cluster_id`, `cluster_size`, dan `is_representative`
+    (baris pertama tiap cluster) ke salinan `df`.
+    """
+    out = df.copy()
+    cluster_ids = cluster_near_duplicates(out[text_col].tolist(), threshold=threshold, **kwargs)
+    out['cluster_id'] = cluster_ids
+    out['cluster_size'] = out.groupby('cluster_id')['cluster_id'].transform('size').to_numpy()
+    out['is_representative'] = ~out['cluster_id'].duplicated().to_numpy()
+    return out
+
+
+def propagate_labels(results_df, columns, cluster_col='cluster_id', rep_col='is_representative'):
+    """Salin hasil perwakilan cluster ke seluruh anggota cluster (vektor, tanpa loop)."""
+    out = results_df.copy()
+    reps = out.loc[out[rep_col], [cluster_col, *columns]].set_index(cluster_col)
+    for column in columns:
+        out[column] = out[cluster_col].map(reps[column]).to_numpy()
+    return out
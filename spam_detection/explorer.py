@@ -0,0 +1,204 @@
+"""
+Explorer hasil deteksi untuk dashboard: filter, pencarian full-text, dan paginasi.
+
+Index dibangun sekali per run di atas DataFrame yang sudah di-cache:
+kolom filter disimpan sebagai array NumPy, indikator sebagai pasangan
+(posisi baris, nilai unik), dan teks unik (`processed_text` + `spam_reason`)
+di tabel SQLite FTS5 contentless. Query hanya menghasilkan array posisi;
+baris baru diambil (`df.iloc`) untuk halaman yang ditampilkan.
+
+Daftar dokumen per term pencarian di-cache sebagai array NumPy (LRU), jadi
+hanya term baru yang dibaca dari FTS5; filter NumPy diterapkan lebih dulu
+dan hasil pencarian cukup dicek pada posisi kandidat.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .storage import parse_created_at, parse_indicators
+
+SEARCH_COLUMNS = ["processed_text", "spam_reason"]
+_FTS_BATCH = 50000
+_POSTING_CACHE = 64
+
+
+def fts_terms(text):
+    """
+    Ubah input bebas user menjadi daftar query FTS5 yang aman, satu per kata:
+    kata di-quote (tanpa operator/sintaks FTS) dan dicocokkan sebagai prefix.
+    Semua term harus cocok (AND).
+    """
+    terms = [t.replace('"', '""') for t in str(text).split()]
+    return list(dict.fromkeys(f'"{t}"*' for t in terms if t.strip('"')))
+
+
+class Explorer:
+    """Index filter + full-text untuk satu DataFrame hasil deteksi (dianggap read-only)."""
+
+    def __init__(self, df, search_columns=SEARCH_COLUMNS):
+        self.df = df
+        self._lock = threading.Lock()
+
+        self.classes, self._class_codes = [], None
+        if "spam_classification" in df:
+            codes, uniques = pd.factorize(df["spam_classification"].astype(str))
+            self._class_codes, self.classes = codes, list(uniques)
+        self.confidence = (pd.to_numeric(df["confidence_score"], errors="coerce").fillna(-1).to_numpy()
+                           if "confidence_score" in df else None)
+
+        self.usernames, self._user_codes, self._user_index = [], None, {}
+        if "username" in df:
+            codes, uniques = pd.factorize(df["username"].astype("string").str.lower(), sort=True)
+            self._user_codes, self.usernames = codes, list(uniques)
+            self._user_index = {name: i for i, name in enumerate(self.usernames)}
+
+        self._days = None
+        if "created_at" in df:
+            created = df["created_at"]
+            if not pd.api.types.is_datetime64_any_dtype(created):
+                created = parse_created_at(created)
+            # Hari sebagai int (epoch day); NaT -> -1 sehingga tidak lolos filter tanggal
+            days = created.dt.tz_localize(None) if created.dt.tz is not None else created
+            self._days = np.where(days.isna(), -1, days.to_numpy("datetime64[D]").astype("int64"))
+
+        # Indikator: pasangan (posisi baris, kode nilai unik) hasil explode
+        self.indicators = pd.Series([], dtype="string")
+        self._ind_positions = self._ind_codes = np.empty(0, dtype=np.int64)
+        if "spam_indicators" in df:
+            indicators = df["spam_indicators"]
+            if indicators.map(lambda v: isinstance(v, str) and not v.startswith("[")).any():
+                # Format dashboard: indikator digabung "; "
+                indicators = indicators.fillna("").map(lambda v: [s for s in v.split("; ") if s])
+            exploded = parse_indicators(indicators.reset_index(drop=True)).explode().dropna()
+            codes, uniques = pd.factorize(exploded)
+            self._ind_positions = exploded.index.to_numpy(dtype=np.int64)
+            self._ind_codes = codes
+            self.indicators = pd.Series(uniques, dtype="string")
+
+        self.search_columns = [c for c in search_columns if c in df]
+        self._fts = None
+        self._postings = OrderedDict()
+        if self.search_columns:
+            self._build_fts()
+
+    def _build_fts(self):
+        # Teks identik (retweet/copy-paste) cukup diindeks sekali: dokumen FTS = teks
+        # unik, `_doc_codes` memetakan setiap baris ke dokumennya.
+        texts = [self.df[c].fillna("").astype(str) for c in self.search_columns]
+        combined = texts[0]
+        for text in texts[1:]:
+            combined = combined + "\x1f" + text
+        codes, uniques = pd.factorize(combined)
+        first = np.unique(codes, return_index=True)[1]
+        texts = [t.to_numpy()[first] for t in texts]
+
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        cols = ", ".join(self.search_columns)
+        # detail=none: cukup untuk pencarian token/prefix dan ~2x lebih cepat dibangun
+        conn.execute(f"CREATE VIRTUAL TABLE docs USING fts5({cols}, content='', detail=none, "
+                     f"columnsize=0, tokenize='unicode61 remove_diacritics 2')")
+        placeholders = ", ".join("?" * (len(texts) + 1))
+        for start in range(0, len(uniques), _FTS_BATCH):
+            stop = min(start + _FTS_BATCH, len(uniques))
+            rows = zip(range(start, stop), *(t[start:stop] for t in texts))
+            conn.executemany(f"INSERT INTO docs(rowid, {cols}) VALUES ({placeholders})", rows)
+        conn.commit()
+        self._fts, self._doc_codes, self._n_docs = conn, codes, len(uniques)
+
+    def _term_docs(self, term):
+        """Kode dokumen (terurut) yang cocok dengan satu term FTS5, di-cache per term."""
+        with self._lock:
+            docs = self._postings.get(term)
+            if docs is None:
+                # group_concat: satu string untuk semua rowid, tanpa tuple Python per baris
+                row = self._fts.execute("SELECT group_concat(rowid) FROM docs WHERE docs MATCH ?",
+                                        (term,)).fetchone()
+                docs = (np.array(row[0].split(","), dtype=np.int64) if row[0]
+                        else np.empty(0, dtype=np.int64))
+                self._postings[term] = docs
+                if len(self._postings) > _POSTING_CACHE:
+                    self._postings.popitem(last=False)
+            else:
+                self._postings.move_to_end(term)
+        return docs
+
+    def search(self, text, positions=None):
+        """
+        Posisi baris (terurut) yang cocok dengan pencarian full-text. Jika
+        `positions` (kandidat hasil filter) diberikan, hanya posisi itu yang dicek.
+        """
+        terms = fts_terms(text)
+        if positions is None:
+            positions = np.arange(len(self.df))
+        if not terms or self._fts is None:
+            return positions
+        # Term dengan dokumen paling sedikit lebih dulu agar irisan cepat mengecil
+        postings = sorted((self._term_docs(t) for t in terms), key=len)
+        docs = postings[0]
+        for other in postings[1:]:
+            docs = np.intersect1d(docs, other, assume_unique=True)
+        matched = np.zeros(self._n_docs, dtype=bool)
+        matched[docs] = True
+        if len(positions) == len(self.df):
+            return np.flatnonzero(matched[self._doc_codes])
+        return positions[matched[self._doc_codes[positions]]]
+
+    def date_range(self):
+        """Tanggal (min, max) data sebagai `datetime.date`, atau None jika tidak ada."""
+        if self._days is None or not (self._days >= 0).any():
+            return None
+        valid = self._days[self._days >= 0]
+        return tuple(np.datetime64(int(d), "D").astype(object) for d in (valid.min(), valid.max()))
+
+    def indicator_mask(self, pattern):
+        """
+        Mask baris yang salah satu indikatornya memuat `pattern` (case-insensitive).
+        Indikator dari LLM berupa teks bebas, jadi pencocokan dilakukan sekali per
+        nilai unik lalu dipetakan balik ke baris.
+        """
+        matched = self.indicators.str.contains(str(pattern), case=False, regex=False).to_numpy(bool)
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[self._ind_positions[matched[self._ind_codes]]] = True
+        return mask
+
+    def query(self, classification=None, min_confidence=None, max_confidence=None,
+              indicator=None, username=None, date_from=None, date_to=None, text=None):
+        """
+        Gabungkan semua filter (AND) dan kembalikan array posisi baris terurut.
+        `indicator` dicocokkan sebagai substring; parameter None/"All"/"" diabaikan.
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+        if classification not in (None, "All") and self._class_codes is not None:
+            code = self.classes.index(classification) if classification in self.classes else -2
+            mask &= self._class_codes == code
+        if self.confidence is not None:
+            if min_confidence is not None:
+                mask &= self.confidence >= min_confidence
+            if max_confidence is not None:
+                mask &= self.confidence <= max_confidence
+        if username and self._user_codes is not None:
+            name = str(username).lstrip("@").lower()
+            code = self._user_index.get(name, -2)
+            mask &= self._user_codes == code
+        if self._days is not None and (date_from is not None or date_to is not None):
+            mask &= self._days >= 0
+            if date_from is not None:
+                mask &= self._days >= np.datetime64(date_from, "D").astype("int64")
+            if date_to is not None:
+                mask &= self._days <= np.datetime64(date_to, "D").astype("int64")
+
+        if indicator not in (None, "All", ""):
+            mask &= self.indicator_mask(indicator)
+        positions = np.flatnonzero(mask)
+        if text and str(text).strip() and len(positions):
+            positions = self.search(text, positions)
+        return positions
+
+    def page(self, positions, offset=0, limit=20, columns=None):
+        """Ambil satu halaman baris (offset/limit) dari hasil `query`."""
+        view = self.df.iloc[positions[offset:offset + limit]]
+        return view[[c for c in columns if c in view.columns]] if columns else view
@@ -0,0 +1,160 @@
+"""
+Ingest hasil crawling tweet-harvest ke satu file gabungan secara inkremental.
+
+Pengganti `pd.concat([pd.read_csv(f) for f in files])` di notebook crawling:
+file crawl dibaca paralel dengan dtype eksplisit (id sebagai string agar id
+19 digit tidak kehilangan presisi), duplikat `id_str` dibuang terhadap index
+id yang sudah pernah masuk (SQLite), dan hanya baris baru yang di-append ke
+`demoDPR_gabungan.csv`. Biaya satu batch crawl sebanding dengan ukuran batch,
+bukan total histori.
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .storage import parse_created_at
+
+ID_COL = "id_str"
+STRING_COLUMNS = ["conversation_id_str", "id_str", "user_id_str", "full_text", "image_url",
+                  "in_reply_to_screen_name", "lang", "location", "tweet_url", "username"]
+COUNT_COLUMNS = ["favorite_count", "quote_count", "reply_count", "retweet_count"]
+CRAWL_DTYPES = {**{c: "string" for c in STRING_COLUMNS}, **{c: "Int64" for c in COUNT_COLUMNS}}
+
+# Format waktu asli tweet-harvest, dipakai saat menulis ke file gabungan
+CREATED_AT_FORMAT = "%a %b %d %H:%M:%S +0000 %Y"
+_SQL_BATCH = 900  # batas aman jumlah parameter SQLite per query
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_ids (
+    id_str TEXT PRIMARY KEY,
+    source TEXT,
+    ingested_at REAL
+) WITHOUT ROWID;
+"""
+
+
+def read_crawl_file(path, parse_dates=True):
+    """Baca satu CSV crawl dengan dtype eksplisit; `created_at` di-parse ke datetime UTC."""
+    header = pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns
+    dtypes = {c: t for c, t in CRAWL_DTYPES.items() if c in header}
+    # Hanya sel kosong yang jadi NA; teks seperti "NA"/"null" di tweet tetap teks
+    df = pd.read_csv(path, dtype=dtypes, encoding="utf-8-sig", keep_default_na=False, na_values=[""])
+    if parse_dates and "created_at" in df:
+        df["created_at"] = parse_created_at(df["created_at"])
+    return df
+
+
+def read_crawl_files(paths, max_workers=4):
+    """Baca banyak file crawl paralel. Return list DataFrame sesuai urutan `paths`."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_crawl_file, paths))
+
+
+class SeenIndex:
+    """Index persisten `id_str` yang sudah masuk file gabungan (SQLite, primary key)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def seen(self, ids):
+        """Subset `ids` yang sudah tercatat (lookup index, sebanding dengan jumlah `ids`)."""
+        ids = list(ids)
+        found = set()
+        for start in range(0, len(ids), _SQL_BATCH):
+            chunk = ids[start:start + _SQL_BATCH]
+            rows = self._conn.execute(
+                f"SELECT id_str FROM seen_ids WHERE id_str IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update(r[0] for r in rows)
+        return found
+
+    def add(self, ids, source=None):
+        now = time.time()
+        self._conn.executemany("INSERT OR IGNORE INTO seen_ids VALUES (?, ?, ?)",
+                               ((i, source, now) for i in ids))
+        self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM seen_ids").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def _store_columns(store_path):
+    if not os.path.exists(store_path) or os.path.getsize(store_path) == 0:
+        return None
+    return list(pd.read_csv(store_path, nrows=0, encoding="utf-8-sig").columns)
+
+
+def _bootstrap_index(index, store_path):
+    """Isi index dari file gabungan lama (sekali saja, hanya kolom id yang dibaca)."""
+    if len(index) or _store_columns(store_path) is None:
+        return
+    ids = pd.read_csv(store_path, usecols=[ID_COL], dtype={ID_COL: "string"},
+                      encoding="utf-8-sig")[ID_COL].dropna()
+    index.add(ids.drop_duplicates().tolist(), source=os.path.basename(store_path))
+
+
+def _append(store_path, new_rows):
+    """Append baris baru ke file gabungan dengan urutan kolom yang sama."""
+    columns = _store_columns(store_path)
+    out = new_rows.copy()
+    if "created_at" in out and pd.api.types.is_datetime64_any_dtype(out["created_at"]):
+        out["created_at"] = out["created_at"].dt.strftime(CREATED_AT_FORMAT)
+    if columns is None:
+        out.to_csv(store_path, index=False, encoding="utf-8-sig")
+    else:
+        out.reindex(columns=columns).to_csv(store_path, mode="a", header=False, index=False,
+                                            encoding="utf-8")
+
+
+def ingest(paths, store_path="demoDPR_gabungan.csv", index_path=None, max_workers=4):
+    """
+    Gabungkan file crawl `paths` ke `store_path` secara inkremental.
+    Return dict statistik: files, rows_read, duplicates_in_batch, already_seen, appended.
+    """
+    index_path = index_path or f"{os.path.splitext(store_path)[0]}.seen.sqlite"
+    index = SeenIndex(index_path)
+    try:
+        _bootstrap_index(index, store_path)
+        frames = read_crawl_files(paths, max_workers=max_workers)
+        for path, frame in zip(paths, frames):
+            frame["source_file"] = os.path.basename(path)
+        batch = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[ID_COL])
+        batch = batch[batch[ID_COL].notna()]
+
+        unique = batch.drop_duplicates(subset=ID_COL)
+        already = index.seen(unique[ID_COL].tolist())
+        new_rows = unique[~unique[ID_COL].isin(already)]
+
+        if len(new_rows):
+            # Tulis data dulu, baru catat id-nya: jika proses mati di antaranya,
+            # batch ter-append ulang saat diulang (duplikat), bukan hilang
+            _append(store_path, new_rows.drop(columns="source_file"))
+            for source, ids in new_rows.groupby("source_file")[ID_COL]:
+                index.add(ids.tolist(), source=source)
+        return {
+            'files': len(paths),
+            'rows_read': len(batch),
+            'duplicates_in_batch': len(batch) - len(unique),
+            'already_seen': len(already),
+            'appended': len(new_rows),
+        }
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    stats = ingest(sys.argv[2:], store_path=sys.argv[1])
+    print(f"✅ {stats['appended']} tweet baru ditambahkan ke '{sys.argv[1]}' "
+          f"({stats['duplicates_in_batch'] + stats['already_seen']} duplikat dilewati)")
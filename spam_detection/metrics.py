@@ -0,0 +1,285 @@
+"""
+Instrumentasi run deteksi spam: counter, gauge, dan histogram latensi.
+
+Modul pipeline (classifier, batch, cache, checkpoint, storage) mencatat ke
+`REGISTRY` global, sehingga terlihat berapa waktu habis di API, parsing,
+penulisan hasil, atau sleep (rate limit/backoff). `MetricsWriter` menulis
+snapshot ke file JSON bergulir yang dibaca halaman "Run Monitor" di dashboard;
+`serve_prometheus` membuka endpoint teks Prometheus untuk scraping.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .registry import OUTPUT_DIR
+
+# Batas atas bucket histogram (detik), dari parsing (ms) sampai panggilan API lambat
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# File snapshot `MetricsWriter` yang dibaca halaman "Run Monitor"
+METRICS_FILENAME = "run_metrics.json"
+METRICS_PATH = os.path.join(OUTPUT_DIR, METRICS_FILENAME)
+# Seri yang diringkas per titik waktu di history (untuk grafik throughput)
+HISTORY_SERIES = {
+    'tweets': 'tweets_classified_total',
+    'llm_requests': 'llm_request_seconds',
+    'retries': 'llm_retries_total',
+    'errors': 'llm_errors_total',
+}
+
+
+def estimate_tokens(text):
+    """Perkiraan jumlah token (~4 karakter per token; tokenizer Granite tidak dimuat)."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def error_type(exc, status=None):
+    """Label jenis error: `http_<status>` jika ada status code, selain itu nama class."""
+    if status is None:
+        status = getattr(exc, "status_code", None)
+    return f"http_{status}" if isinstance(status, int) else type(exc).__name__
+
+
+class Histogram:
+    """Histogram bucket tetap (gaya Prometheus) dengan estimasi kuantil."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # elemen terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimasi kuantil dengan interpolasi linear di dalam bucket (seperti `histogram_quantile`)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        """List (batas atas, jumlah kumulatif); batas terakhir `+Inf`."""
+        out, total = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _series_name(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """Registry metrik thread-safe. Label diberikan sebagai keyword argument."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Kosongkan semua metrik (dipanggil di awal setiap run)."""
+        with self._lock:
+            self._counters = {}
+            self._gauges = {}
+            self._histograms = {}
+            self.started_at = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Catat durasi blok `with` (detik) ke histogram `name`, termasuk saat exception."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def total(self, name):
+        """Jumlah counter/gauge `name` semua label (untuk histogram: jumlah observasi)."""
+        with self._lock:
+            values = [v for (n, _), v in self._counters.items() if n == name]
+            values += [v for (n, _), v in self._gauges.items() if n == name]
+            values += [h.count for (n, _), h in self._histograms.items() if n == name]
+        return sum(values)
+
+    def snapshot(self):
+        """Semua metrik sebagai dict yang bisa di-JSON-kan."""
+        with self._lock:
+            counters = [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in self._counters.items()]
+            gauges = [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in self._gauges.items()]
+            histograms = [{
+                'name': n,
+                'labels': dict(l),
+                'count': h.count,
+                'sum': round(h.sum, 6),
+                'p50': h.quantile(0.50),
+                'p90': h.quantile(0.90),
+                'p99': h.quantile(0.99),
+            } for (n, l), h in self._histograms.items()]
+        cache = {c['labels'].get('result'): c['value'] for c in counters if c['name'] == 'cache_requests_total'}
+        lookups = cache.get('hit', 0) + cache.get('miss', 0)
+        return {
+            'started_at': self.started_at,
+            'counters': counters,
+            'gauges': gauges,
+            'histograms': histograms,
+            'cache_hit_rate': cache.get('hit', 0) / lookups if lookups else None,
+        }
+
+    def to_prometheus(self):
+        """Format teks eksposisi Prometheus (0.0.4)."""
+        lines = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted({n for n, _ in store}):
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines += [f"{_series_name(n, l)} {v}" for (n, l), v in store.items() if n == name]
+            for name in sorted({n for n, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), hist in self._histograms.items():
+                    if n != name:
+                        continue
+                    for bound, count in hist.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{_series_name(name + '_bucket', labels + (('le', le),))} {count}")
+                    lines.append(f"{_series_name(name + '_sum', labels)} {hist.sum}")
+                    lines.append(f"{_series_name(name + '_count', labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Metrics()
+
+
+def count_tokens(prompt, response, registry=REGISTRY):
+    """Catat perkiraan token prompt & jawaban satu panggilan LLM."""
+    registry.inc('llm_prompt_tokens_total', estimate_tokens(prompt))
+    registry.inc('llm_completion_tokens_total', estimate_tokens(response))
+
+
+class MetricsWriter:
+    """
+    Tulis snapshot `registry` ke file JSON setiap `interval` detik (ganti atomik),
+    beserta history ringkas `history` titik terakhir untuk grafik throughput.
+    """
+
+    def __init__(self, path=METRICS_PATH, registry=REGISTRY, interval=2.0, history=600, run_id=None):
+        self.path = path
+        self.registry = registry
+        self.interval = interval
+        self.run_id = run_id
+        self.history = deque(maxlen=history)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write(self, status="running"):
+        now = time.time()
+        self.history.append({'t': now, **{k: self.registry.total(n) for k, n in HISTORY_SERIES.items()}})
+        payload = {
+            'run_id': self.run_id,
+            'status': status,
+            'updated_at': now,
+            **self.registry.snapshot(),
+            'history': list(self.history),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.write()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, status="finished"):
+        """Hentikan thread dan tulis snapshot terakhir dengan `status`."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write(status)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, *exc):
+        self.stop("failed" if exc_type else "finished")
+
+
+def read_metrics(path):
+    """Baca file dari `MetricsWriter`, atau None jika belum ada / tidak valid."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def serve_prometheus(registry=REGISTRY, port=9108, host="127.0.0.1"):
+    """Jalankan endpoint `GET /metrics` di thread daemon. Return server (panggil `shutdown()` untuk berhenti)."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,179 @@
+"""
+Prefilter murah (rule + ML opsional) sebelum tweet dikirim ke Granite.
+
+Sebagian KRITERIA SPAM bisa dicek secara mekanis (link pendek, "!!!", ALL CAPS,
+kata promosi, tweet berisi link saja). Fitur dihitung kolom-per-kolom dengan
+operasi string pandas sehingga ~100k tweet/detik pada satu core.
+Hanya tweet di "uncertain band" yang diteruskan ke LLM.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .metrics import REGISTRY
+
+_URL = r"https?://\S+|www\.\S+"
+_SHORT_URL = r"(?i)\b(?:bit\.ly|tinyurl\.com|s\.id|cutt\.ly|shorturl\.at|rb\.gy|is\.gd|goo\.gl|ow\.ly|lnkd\.in|t\.ly)/"
+_EXCESS_PUNCT = r"[!?]{3,}"
+_PROMO = r"(?i)\b(?:gratis|promo|diskon|klik|menang|bonus|cashback|voucher|kode|saldo|hadiah|giveaway|free|buruan|order)\b"
+_PERSONAL_INFO = r"(?i)\b(?:password|pin|otp|rekening|no\.? ?rek|kartu kredit|data bank)\b"
+_SPAM_WORDS = r"(?i)\b(?:mlm|investasi|judi|slot|gacor|togel|deposit|maxwin|pinjol|cuan instan)\b"
+_HASHTAG = r"#\w+"
+_CAPS_RUN = r"[A-Z]{4}"
+_STRIP_FOR_BODY = r"(?:https?://|www\.|[@#])\S+|[^A-Za-z]+"
+
+# (nama fitur, nomor kriteria di prompt, bobot kontribusi ke skor spam)
+RULES = [
+    ('short_url', "1. URL/Link mencurigakan", 0.45),
+    ('many_urls', "1. URL/Link mencurigakan", 0.8),
+    ('promo_words', "2. Promosi berlebihan", 0.45),
+    ('excess_punct', "3. Excessive punctuation", 0.25),
+    ('all_caps', "4. ALL CAPS berlebihan", 0.25),
+    ('personal_info', "5. Meminta informasi pribadi", 0.5),
+    ('hashtag_stuffing', "9. Promosi tanpa konteks yang relevan", 0.35),
+    ('link_only', "9. Promosi tanpa konteks yang relevan", 0.7),
+    ('spam_words', "10. Mengandung kata spam umum", 0.6),
+]
+
+
+def compute_features(texts):
+    """Hitung fitur rule untuk seluruh Series teks (tanpa loop Python per baris)."""
+    texts = pd.Series(texts).fillna("").astype(str)
+    n_urls = texts.str.count(_URL)
+    # "Body" = huruf saja tanpa URL/mention/hashtag, untuk cek ALL CAPS dan link-only.
+    # Regex ini paling mahal, jadi hanya dihitung untuk baris yang punya URL atau huruf kapital beruntun.
+    need_body = (n_urls > 0) | texts.str.contains(_CAPS_RUN, regex=True)
+    body = texts[need_body].str.replace(_STRIP_FOR_BODY, "", regex=True)
+    body_len = body.str.len().reindex(texts.index, fill_value=0)
+    all_caps = ((body.str.len() >= 15) & (body == body.str.upper())).reindex(texts.index, fill_value=False)
+    features = pd.DataFrame({
+        'n_urls': n_urls,
+        'short_url': texts.str.contains(_SHORT_URL, regex=True),
+        'many_urls': n_urls >= 3,
+        'hashtag_stuffing': texts.str.count(_HASHTAG) >= 4,
+        'promo_words': texts.str.count(_PROMO) >= 2,
+        'excess_punct': texts.str.contains(_EXCESS_PUNCT, regex=True),
+        'all_caps': all_caps,
+        'personal_info': texts.str.contains(_PERSONAL_INFO, regex=True),
+        'link_only': need_body & (n_urls > 0) & (body_len < 5),
+        'spam_words': texts.str.contains(_SPAM_WORDS, regex=True),
+    }, index=texts.index)
+    return features
+
+
+def rule_scores(features):
+    """Skor spam 0-1 = 1 - prod(1 - bobot) untuk setiap rule yang terpenuhi."""
+    keep = np.ones(len(features))
+    for name, _, weight in RULES:
+        keep *= np.where(features[name].to_numpy(), 1.0 - weight, 1.0)
+    return 1.0 - keep
+
+
+def rule_indicators(features, mask=None):
+    """
+    Daftar indikator (nama kriteria) per baris untuk rule yang terpenuhi.
+    Jika `mask` diberikan, hanya baris terpilih yang dihitung (lainnya list kosong).
+    """
+    hits = features[[name for name, _, _ in RULES]].to_numpy()
+    labels = np.array([label for _, label, _ in RULES], dtype=object)
+    rows = np.flatnonzero(mask) if mask is not None else range(len(hits))
+    indicators = [[] for _ in range(len(hits))]
+    for i in rows:
+        indicators[i] = list(dict.fromkeys(labels[hits[i]]))
+    return indicators
+
+
+class Prefilter:
+    """
+    Putuskan kasus mudah secara lokal dari satu skor gabungan
+    max(skor rule, probabilitas model): Spam jika >= `spam_threshold`, Not Spam
+    jika <= `not_spam_threshold`. Not Spam hanya diputuskan jika ada model
+    TF-IDF (skor rule 0 berarti tidak ada rule yang kena, bukan pasti bersih).
+    """
+
+    def __init__(self, spam_threshold=0.8, not_spam_threshold=None):
+        self.spam_threshold = spam_threshold
+        self.not_spam_threshold = not_spam_threshold
+        self.model = None
+        self.stats = {'total': 0, 'local_spam': 0, 'local_not_spam': 0, 'to_llm': 0}
+
+    def fit_model(self, labeled_df, text_col='processed_text', label_col='spam_classification',
+                  not_spam_threshold=0.1):
+        """
+        Latih TF-IDF + Logistic Regression dari output `deteksi_spam_detail_*`
+        (butuh scikit-learn).
+        """
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.pipeline import make_pipeline
+        except ImportError as e:
+            raise ImportError("fit_model membutuhkan scikit-learn: pip install scikit-learn") from e
+
+        labeled = labeled_df[labeled_df[label_col].isin(["Spam", "Not Spam"])]
+        self.model = make_pipeline(
+            TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), min_df=2, sublinear_tf=True),
+            LogisticRegression(max_iter=1000, class_weight="balanced"),
+        )
+        self.model.fit(labeled[text_col].fillna("").astype(str), labeled[label_col] == "Spam")
+        if self.not_spam_threshold is None:
+            self.not_spam_threshold = not_spam_threshold
+        return self
+
+    def model_proba(self, texts):
+        """Probabilitas spam dari model (None jika belum `fit_model`)."""
+        if self.model is None:
+            return None
+        return self.model.predict_proba(pd.Series(texts).fillna("").astype(str))[:, 1]
+
+    def score(self, texts, features=None, proba=None):
+        """Skor spam 0-1: max(skor rule, probabilitas model jika ada)."""
+        if features is None:
+            features = compute_features(texts)
+        scores = rule_scores(features)
+        if proba is None:
+            proba = self.model_proba(texts)
+        return scores if proba is None else np.maximum(scores, proba)
+
+    def decide(self, df, text_col='processed_text'):
+        """
+        Return DataFrame (index sama dengan `df`) berisi `prefilter_score` dan
+        `prefilter_label` ("Spam"/"Not Spam", atau None = kirim ke LLM).
+        """
+        texts = df[text_col]
+        features = compute_features(texts)
+        proba = self.model_proba(texts)
+        scores = self.score(texts, features, proba)
+        labels = np.full(len(df), None, dtype=object)
+        is_spam = scores >= self.spam_threshold
+        labels[is_spam] = "Spam"
+        if proba is not None and self.not_spam_threshold is not None:
+            labels[scores <= self.not_spam_threshold] = "Not Spam"
+
+        self.stats['total'] += len(df)
+        self.stats['local_spam'] += int((labels == "Spam").sum())
+        self.stats['local_not_spam'] += int((labels == "Not Spam").sum())
+        self.stats['to_llm'] += int(pd.isna(labels).sum())
+        for label in ("Spam", "Not Spam"):
+            REGISTRY.inc('prefilter_decisions_total', int((labels == label).sum()), label=label)
+        return pd.DataFrame({
+            'prefilter_score': scores,
+            'prefilter_label': labels,
+            'prefilter_indicators': rule_indicators(features, mask=pd.notna(labels)),
+        }, index=df.index)
+
+    def llm_calls_saved(self):
+        return self.stats['local_spam'] + self.stats['local_not_spam']
+
+
+def local_result(label, score, indicators):
+    """Hasil prefilter dalam format yang sama dengan `classify_spam_with_explanation`."""
+    confidence = int(np.clip(round(score * 10 if label == "Spam" else (1 - score) * 10), 1, 10))
+    reason = ("Prefilter lokal: " + ", ".join(indicators)) if indicators else "Prefilter lokal: tidak ada indikator spam"
+    return {
+        'classification': label,
+        'confidence_score': confidence,
+        'indicators': indicators,
+        'reason': reason,
+        'full_response': ""
+    }
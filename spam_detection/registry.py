@@ -0,0 +1,136 @@
+"""
+Registry run hasil deteksi di direktori `Output/`.
+
+Setiap run notebook menulis beberapa artefak bertimestamp
+(`deteksi_spam_detail_20250828_070506.csv`, `spam_detection_report_20250828_070511.md`,
+...). Registry mengelompokkan artefak tersebut per run, atau membaca
+`manifest.json` jika pipeline menuliskannya, dan memberi fingerprint
+(mtime + ukuran) untuk invalidasi cache dashboard.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+# Direktori hasil bersama notebook, service, dan dashboard (relatif terhadap root repo)
+OUTPUT_DIR = "Output"
+MANIFEST_NAME = "manifest.json"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# prefix nama file -> jenis artefak
+ARTIFACT_PREFIXES = {
+    "deteksi_spam_detail": "detail",
+    "tweet_spam_summary": "summary",
+    "spam_detection_report": "report",
+    "spam_word_analysis": "word_analysis",
+    "visualisasi_spam_detail": "visualization",
+    "wordcloud_spam_analysis": "wordcloud",
+}
+
+# Artefak lanjutan (report, wordcloud, ...) ditulis beberapa detik/menit setelah
+# file detail; artefak dianggap milik run detail terakhir dalam jendela ini.
+RUN_WINDOW_SECONDS = 6 * 3600
+
+_ARTIFACT_RE = re.compile(
+    r"^(?P<prefix>%s)_(?P<ts>\d{8}_\d{6})(?P<ext>\.\w+)?$" % "|".join(ARTIFACT_PREFIXES)
+)
+
+
+def fingerprint(path):
+    """Fingerprint murah untuk file atau direktori dataset: (mtime_ns terbaru, total ukuran)."""
+    if os.path.isdir(path):
+        latest, size = 0, 0
+        for directory, _, files in os.walk(path):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(directory, name))
+                except FileNotFoundError:  # staging/sumber compaction yang baru dihapus
+                    continue
+                latest, size = max(latest, stat.st_mtime_ns), size + stat.st_size
+        return f"{latest}-{size}"
+    if os.path.exists(path):
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    return "missing"
+
+
+def _scan(output_dir):
+    """Kumpulkan artefak bertimestamp: list (timestamp, kind, path)."""
+    found = []
+    for name in os.listdir(output_dir):
+        match = _ARTIFACT_RE.match(name)
+        if not match:
+            continue
+        kind = ARTIFACT_PREFIXES[match.group("prefix")]
+        path = os.path.join(output_dir, name)
+        # Dataset Parquet (direktori) didahulukan dibanding CSV dengan nama sama
+        if kind == "detail" and os.path.isdir(path):
+            kind = "detail_dataset"
+        found.append((datetime.strptime(match.group("ts"), TIMESTAMP_FORMAT), kind, path))
+    return sorted(found)
+
+
+def _read_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            runs = json.load(f).get("runs", {})
+    except (ValueError, OSError):
+        return {}
+    return {
+        run_id: {kind: os.path.join(output_dir, rel) for kind, rel in artifacts.items()}
+        for run_id, artifacts in runs.items()
+    }
+
+
+def list_runs(output_dir=OUTPUT_DIR):
+    """
+    Daftar run (terbaru dulu). Setiap run berupa dict:
+    `{'run_id', 'timestamp', 'artifacts': {kind: path}}`.
+    """
+    if not os.path.isdir(output_dir):
+        return []
+    runs = {}
+    current = None
+    for ts, kind, path in _scan(output_dir):
+        if kind in ("detail", "detail_dataset"):
+            run_id = ts.strftime(TIMESTAMP_FORMAT)
+            if current is None or current["run_id"] != run_id:
+                current = runs.setdefault(run_id, {'run_id': run_id, 'timestamp': ts, 'artifacts': {}})
+        elif current is None or (ts - current["timestamp"]).total_seconds() > RUN_WINDOW_SECONDS:
+            continue
+        current["artifacts"].setdefault(kind, path)
+
+    for run_id, artifacts in _read_manifest(output_dir).items():
+        run = runs.setdefault(run_id, {
+            'run_id': run_id,
+            'timestamp': datetime.strptime(run_id, TIMESTAMP_FORMAT),
+            'artifacts': {},
+        })
+        run["artifacts"].update({k: p for k, p in artifacts.items() if os.path.exists(p)})
+
+    return sorted((r for r in runs.values() if detail_path(r)), key=lambda r: r["timestamp"], reverse=True)
+
+
+def detail_path(run):
+    """Path hasil deteksi untuk run (dataset Parquet jika ada, selain itu CSV)."""
+    artifacts = run["artifacts"]
+    return artifacts.get("detail_dataset") or artifacts.get("detail")
+
+
+def record_artifact(output_dir, run_id, kind, path):
+    """Catat artefak sebuah run ke `manifest.json` (dipanggil dari notebook/pipeline)."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {"runs": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    rel = os.path.relpath(path, output_dir)
+    manifest.setdefault("runs", {}).setdefault(run_id, {})[kind] = rel
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
@@ -0,0 +1,386 @@
+"""
+Laporan hasil deteksi spam (pengganti `generate_spam_report` / `analyze_spam_patterns`).
+
+Indikator dari LLM berupa teks bebas ("1, 2, 8", "1. URL/Link mencurigakan",
+"1 (ALL CAPS), 8 (Clickbait extreme)"), sehingga hitungan terpecah ke banyak
+ejaan. Di sini indikator dinormalisasi ke 10 nomor KRITERIA SPAM sekali per
+nilai unik, lalu semua bagian laporan (ringkasan, kriteria, confidence, per hari,
+per akun, contoh) dihitung dari satu frame dengan operasi vektor. Markdown dan
+CSV ringkasan dirender dari template.
+"""
+
+import os
+import re
+from datetime import datetime
+from string import Template
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from .classifier import SPAM_CRITERIA
+from .registry import record_artifact
+from .storage import parse_created_at, parse_indicators, read_results, read_texts
+
+# Nomor -> nama kriteria, diambil dari prompt agar selalu sinkron ("1. URL/Link mencurigakan (...)")
+CRITERIA = {
+    int(number): name.strip()
+    for number, name in re.findall(r"^(\d+)\. ([^(\n]+)", SPAM_CRITERIA.split("\n\n")[0], flags=re.M)
+}
+OTHER = 0  # indikator spam yang tidak cocok dengan kriteria mana pun
+CRITERION_NAMES = {OTHER: "Lainnya", **CRITERIA}
+
+# Kata kunci per kriteria. Urutan penting: yang lebih spesifik dicek dulu
+# ("link pendek tanpa konteks" = 1, "promosi tanpa konteks" = 9, "promosi" = 2)
+_CRITERION_PATTERNS = [(number, re.compile(pattern)) for number, pattern in [
+    (1, r"url|link|tautan|bit\.ly|tinyurl"),
+    (9, r"tanpa konteks|tidak relevan|hashtag|tagar"),
+    (5, r"informasi pribadi|data pribadi|password|\bpin\b|otp|data bank|rekening"),
+    (6, r"terlalu bagus|too good|penawaran"),
+    (10, r"kata spam|\bmlm\b|investasi|judi|slot|pinjol"),
+    (7, r"duplikat|template|berulang|copy"),
+    (8, r"clickbait|wajib tahu|rahasia"),
+    (3, r"punctuation|tanda baca|emoji|[!?]{3,}"),
+    (4, r"caps|huruf (?:besar|kapital)|mixed case"),
+    (2, r"promosi|promo|gratis|menang|klik|iklan"),
+]]
+# KRITERIA NOT SPAM dan hasil error bukan indikator spam
+_NOT_SPAM_PATTERN = re.compile(
+    r"percakapan normal|diskusi|berita|informasi faktual|opini|interaksi sosial|edukatif"
+    r"|status personal|tidak ada|error dalam analisis")
+_SEGMENT_SPLIT = re.compile(r"[,;\n](?![^()]*\))")  # pemisah di luar tanda kurung
+_NUMBERED = re.compile(r"^\W*(\d{1,2})\b\s*[.):-]?\s*(.*)$", re.S)
+
+# Kolom yang dibaca laporan dari tabel deteksi
+REPORT_COLUMNS = ['id_str', 'processed_text', 'spam_classification', 'confidence_score', 'spam_indicators',
+                  'created_at', 'username', 'user_id_str']
+SUMMARY_COLUMNS = ['processed_text', 'confidence_score', 'spam_criteria', 'spam_indicators', 'spam_reason']
+
+REPORT_TEMPLATE = Template("""
+# LAPORAN DETAIL DETEKSI SPAM TWITTER
+
+## Ringkasan Eksekutif
+- **Total Tweet Dianalisis**: $total
+- **Tweet Spam Terdeteksi**: $spam ($spam_pct%)
+- **Tweet Not Spam**: $not_spam ($not_spam_pct%)
+- **Tweet Gagal Dianalisis**: $errors
+- **Rata-rata Confidence**: Spam $avg_conf_spam/10, Not Spam $avg_conf_not_spam/10
+- **Periode Data**: $period
+- **Waktu Analisis**: $generated_at
+
+## Top Indikator Spam
+$criteria_table
+
+## Distribusi Confidence Score
+$confidence_table
+
+## Tren Harian
+$daily_table
+
+## Akun dengan Spam Terbanyak
+$users_table
+
+## Contoh Tweet Spam Confidence Tertinggi
+$examples
+""")
+
+EXAMPLE_TEMPLATE = Template("""
+### Contoh $rank (Confidence: $confidence/10)
+**Tweet**: $text
+**Kriteria**: $criteria
+**Alasan**: $reason
+""")
+
+
+def criteria_ids(text):
+    """
+    Nomor kriteria spam (tuple, urut) dari satu teks indikator. Nama/kata kunci
+    diutamakan di atas nomor karena LLM sering menomori ulang ("1 (ALL CAPS)");
+    nomor polos dianggap nomor KRITERIA SPAM. Indikator yang tidak dikenali -> `OTHER`.
+    """
+    ids = set()
+    for segment in _SEGMENT_SPLIT.split(str(text).lower()):
+        segment = segment.strip()
+        if not segment:
+            continue
+        number = None
+        match = _NUMBERED.match(segment)
+        if match:
+            number, segment = int(match.group(1)), match.group(2)
+        segment = segment.strip(" ()[]\"'.:-")
+        if not re.search(r"[a-z]", segment):
+            if number in CRITERIA:
+                ids.add(number)
+            continue
+        found = next((n for n, pattern in _CRITERION_PATTERNS if pattern.search(segment)), None)
+        if found is not None:
+            ids.add(found)
+        elif not _NOT_SPAM_PATTERN.search(segment):
+            ids.add(OTHER)
+    return tuple(sorted(ids))
+
+
+def _indicator_keys(values):
+    """Indikator per baris sebagai teks hashable (list dari Parquet digabung dengan koma)."""
+    values = pd.Series(values)
+    if values.dtype == object and len(values) and isinstance(values.iloc[0], (list, tuple, np.ndarray)):
+        try:
+            # Kolom list<string> dari Parquet: gabung di Arrow (C++), bukan per baris di Python
+            joined = pc.binary_join(pa.array(values.tolist(), type=pa.list_(pa.string())), ", ")
+            return pd.Series(joined.to_numpy(zero_copy_only=False), index=values.index)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    if pd.api.types.is_string_dtype(values) and values.dtype != object:
+        return values
+    return values.map(lambda v: ", ".join(map(str, v)) if isinstance(v, (list, tuple, np.ndarray)) else v)
+
+
+def indicator_matrix(values):
+    """
+    Normalisasi indikator sekali per nilai unik. Return `(codes, matrix)`:
+    `codes[i]` = indeks nilai unik baris i (-1 jika kosong), `matrix[u, k]` = nilai
+    unik u memuat kriteria k (kolom 0 = `OTHER`). Kriteria per baris = `matrix[codes]`.
+    """
+    codes, uniques = pd.factorize(_indicator_keys(values))
+    matrix = np.zeros((len(uniques) + 1, len(CRITERION_NAMES)), dtype=bool)  # baris terakhir untuk -1
+    for u, items in enumerate(parse_indicators(pd.Series(uniques, dtype=object))):
+        matrix[u, list(criteria_ids(", ".join(items)))] = True
+    return codes, matrix
+
+
+def _criteria_labels(matrix):
+    """Nama kriteria ("; ") per baris `matrix`."""
+    names = np.array([CRITERION_NAMES[k] for k in range(matrix.shape[1])], dtype=object)
+    return np.array(["; ".join(names[row]) for row in matrix], dtype=object)
+
+
+def build_report(results_df, top_users=10, top_examples=5, max_days=31):
+    """
+    Hitung semua bagian laporan dari hasil deteksi (DataFrame notebook atau
+    `read_results`). Return dict berisi ringkasan dan tabel-tabel (DataFrame).
+    """
+    n = len(results_df)
+    is_spam = (results_df['spam_classification'] == "Spam").to_numpy()
+    confidence = pd.to_numeric(results_df['confidence_score'], errors='coerce').to_numpy(dtype=float)
+    codes, matrix = indicator_matrix(results_df['spam_indicators'])
+    # Kriteria hanya bermakna untuk tweet Spam (Not Spam sering menyebut nomor KRITERIA NOT SPAM)
+    row_criteria = matrix[codes] & is_spam[:, None]
+    n_spam = int(is_spam.sum())
+
+    # `spam_reason` ada di side table teks pada dataset Parquet (lihat `report_from_dataset`)
+    reasons = results_df['spam_reason'] if 'spam_reason' in results_df else pd.Series("", index=results_df.index)
+    errors = int(reasons.astype("string").str.startswith("Error:").fillna(False).sum())
+
+    criterion_counts = row_criteria.sum(axis=0)
+    order = [k for k in np.argsort(-criterion_counts, kind="stable") if criterion_counts[k]]
+    criteria = pd.DataFrame({
+        'criterion': order,
+        'name': [CRITERION_NAMES[k] for k in order],
+        'tweets': criterion_counts[order],
+        'pct_spam': np.round(criterion_counts[order] / max(n_spam, 1) * 100, 2),
+    })
+
+    scores = pd.Series(confidence).round().astype("Int64")
+    confidence_table = (pd.crosstab(scores, np.where(is_spam, "Spam", "Not Spam"))
+                        .reindex(range(1, 11), fill_value=0)
+                        .reindex(columns=["Spam", "Not Spam"], fill_value=0)
+                        .rename_axis(index='confidence', columns=None))
+
+    per_day = None
+    if 'created_at' in results_df:
+        days = parse_created_at(results_df['created_at']).dt.tz_convert(None).dt.floor("D").to_numpy()
+        frame = pd.DataFrame({'day': days, 'spam': is_spam})
+        grouped = frame.groupby('day', sort=True)['spam']
+        per_day = pd.DataFrame({'tweets': grouped.size(), 'spam': grouped.sum()})
+        per_day['spam_rate'] = np.round(per_day['spam'] / per_day['tweets'] * 100, 2)
+        by_criterion = pd.DataFrame(row_criteria[is_spam], index=days[is_spam]).groupby(level=0).sum()
+        top = by_criterion.idxmax(axis=1).where(by_criterion.max(axis=1) > 0)
+        per_day['top_criterion'] = top.map(CRITERION_NAMES).reindex(per_day.index)
+        per_day.index = per_day.index.date
+        per_day.index.name = 'date'
+
+    per_user = None
+    if 'username' in results_df or 'user_id_str' in results_df:
+        # tweet-harvest kadang tidak mengisi username; pakai user_id_str sebagai gantinya
+        users = results_df['username'] if 'username' in results_df else pd.Series(np.nan, index=results_df.index)
+        if 'user_id_str' in results_df:
+            users = users.fillna(results_df['user_id_str'].astype("string"))
+        frame = pd.DataFrame({
+            'user': users.to_numpy(),
+            'spam': is_spam,
+            'spam_confidence': np.where(is_spam, confidence, np.nan),
+        })
+        grouped = frame.groupby('user', sort=False)
+        per_user = pd.DataFrame({
+            'tweets': grouped.size(),
+            'spam': grouped['spam'].sum(),
+            'avg_spam_confidence': grouped['spam_confidence'].mean().round(2),
+        })
+        per_user['spam_rate'] = np.round(per_user['spam'] / per_user['tweets'] * 100, 2)
+        per_user = per_user[per_user['spam'] > 0].nlargest(top_users, ['spam', 'spam_rate'])
+
+    spam_positions = np.flatnonzero(is_spam)
+    top = pd.Series(confidence[spam_positions], index=spam_positions).nlargest(top_examples).index.to_numpy()
+    text_col = next((c for c in ('processed_text', 'full_text') if c in results_df), None)
+    top_spam = pd.DataFrame({
+        'id_str': results_df['id_str'].iloc[top].to_numpy() if 'id_str' in results_df else None,
+        'text': results_df[text_col].iloc[top].to_numpy() if text_col else "",
+        'confidence_score': confidence[top],
+        'criteria': _criteria_labels(row_criteria[top]),
+        'spam_reason': reasons.iloc[top].to_numpy(),
+    })
+
+    with np.errstate(invalid='ignore'):
+        summary = {
+            'total': n,
+            'spam': n_spam,
+            'not_spam': n - n_spam,
+            'errors': errors,
+            'avg_conf_spam': float(np.nanmean(confidence[is_spam])) if n_spam else None,
+            'avg_conf_not_spam': float(np.nanmean(confidence[~is_spam])) if n > n_spam else None,
+            'first_day': per_day.index.min() if per_day is not None and len(per_day) else None,
+            'last_day': per_day.index.max() if per_day is not None and len(per_day) else None,
+        }
+    return {
+        'summary': summary,
+        'criteria': criteria,
+        'confidence': confidence_table,
+        'per_day': per_day.tail(max_days) if per_day is not None else None,
+        'per_user': per_user,
+        'top_spam': top_spam,
+        '_codes': codes,
+        '_matrix': matrix,
+    }
+
+
+def report_from_dataset(root, **kwargs):
+    """
+    `build_report` untuk dataset Parquet hasil `write_results`: hanya kolom ringan
+    yang dimuat; teks besar (`spam_reason`) diambil dari side table untuk contoh saja.
+    """
+    results_df = read_results(root, columns=REPORT_COLUMNS)
+    report = build_report(results_df, **kwargs)
+    top_spam = report['top_spam']
+    if len(top_spam):
+        texts = read_texts(root, columns=['spam_reason'], ids=top_spam['id_str']).drop_duplicates('id_str')
+        top_spam['spam_reason'] = top_spam['id_str'].map(texts.set_index('id_str')['spam_reason'])
+    return results_df, report
+
+
+def _cell(value):
+    text = "" if value is None or (isinstance(value, float) and np.isnan(value)) else str(value)
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def markdown_table(df, index=True):
+    """DataFrame kecil -> tabel Markdown (tanpa dependensi `tabulate`)."""
+    if df is None or len(df) == 0:
+        return "_Tidak ada data._"
+    if index:
+        df = df.reset_index()
+    lines = ["| " + " | ".join(map(_cell, df.columns)) + " |", "|" + "---|" * len(df.columns)]
+    lines += ["| " + " | ".join(map(_cell, row)) + " |" for row in df.itertuples(index=False)]
+    return "\n".join(lines)
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def render_markdown(report, generated_at=None):
+    """Render laporan Markdown dari `REPORT_TEMPLATE`."""
+    summary = report['summary']
+    total = max(summary['total'], 1)
+    period = (f"{summary['first_day']} s/d {summary['last_day']}"
+              if summary['first_day'] is not None else "tidak tersedia")
+    examples = "".join(
+        EXAMPLE_TEMPLATE.substitute(
+            rank=rank,
+            confidence=f"{row.confidence_score:g}",
+            text=str(row.text)[:100] + ("..." if len(str(row.text)) > 100 else ""),
+            criteria=row.criteria or "-",
+            reason=row.spam_reason,
+        )
+        for rank, row in enumerate(report['top_spam'].itertuples(index=False), 1)
+    ) or "_Tidak ada tweet spam._\n"
+    return REPORT_TEMPLATE.substitute(
+        total=f"{summary['total']:,}",
+        spam=f"{summary['spam']:,}",
+        spam_pct=f"{summary['spam'] / total * 100:.2f}",
+        not_spam=f"{summary['not_spam']:,}",
+        not_spam_pct=f"{summary['not_spam'] / total * 100:.2f}",
+        errors=f"{summary['errors']:,}",
+        avg_conf_spam=_fmt(summary['avg_conf_spam'], ".2f"),
+        avg_conf_not_spam=_fmt(summary['avg_conf_not_spam'], ".2f"),
+        period=period,
+        generated_at=(generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
+        criteria_table=markdown_table(report['criteria'], index=False),
+        confidence_table=markdown_table(report['confidence']),
+        daily_table=markdown_table(report['per_day']),
+        users_table=markdown_table(report['per_user']),
+        examples=examples,
+    )
+
+
+def spam_summary(results_df, report):
+    """Tabel ringkasan tweet spam (`SUMMARY_COLUMNS`) dengan kolom kriteria kanonik."""
+    is_spam = (results_df['spam_classification'] == "Spam").to_numpy()
+    codes = report['_codes'][is_spam]
+    labels = _criteria_labels(report['_matrix'])  # sekali per nilai unik, bukan per baris
+    summary = results_df.loc[is_spam].copy()
+    summary['spam_criteria'] = labels[codes]
+    if 'spam_indicators' in summary:
+        summary['spam_indicators'] = _indicator_keys(summary['spam_indicators'])
+    return summary.reindex(columns=SUMMARY_COLUMNS)
+
+
+def write_report(results_df, run_id, output_dir=".", report=None):
+    """
+    Tulis `spam_detection_report_<run_id>.md` dan `tweet_spam_summary_<run_id>.csv`
+    ke `output_dir`, lalu catat keduanya di manifest. Return `(report, paths)`.
+    """
+    report = report or build_report(results_df)
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, f"spam_detection_report_{run_id}.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(render_markdown(report))
+    record_artifact(output_dir, run_id, 'report', report_path)
+    paths = {'report': report_path}
+    if report['summary']['spam']:
+        summary_path = os.path.join(output_dir, f"tweet_spam_summary_{run_id}.csv")
+        # Writer CSV Arrow (C++) jauh lebih cepat dari `to_csv` untuk ratusan ribu baris teks
+        pa_csv.write_csv(pa.Table.from_pandas(spam_summary(results_df, report), preserve_index=False),
+                         summary_path)
+        record_artifact(output_dir, run_id, 'summary', summary_path)
+        paths['summary'] = summary_path
+    return report, paths
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Laporan deteksi spam dari hasil run (dataset Parquet atau CSV)")
+    parser.add_argument("path", help="Output/deteksi_spam_detail_<run_id>/ atau .csv")
+    parser.add_argument("--run-id", default=None, help="default: diambil dari nama file/direktori")
+    parser.add_argument("--output-dir", default=None, help="default: direktori induk `path`")
+    args = parser.parse_args(argv)
+
+    path = os.path.normpath(args.path)
+    run_id = args.run_id or os.path.splitext(os.path.basename(path))[0].replace("deteksi_spam_detail_", "")
+    output_dir = args.output_dir or os.path.dirname(path) or "."
+    if os.path.isdir(path):
+        results_df, report = report_from_dataset(path)
+        reasons = read_texts(path, columns=['spam_reason']).drop_duplicates('id_str')
+        results_df = results_df.merge(reasons, on='id_str', how='left')
+    else:
+        results_df = pd.read_csv(path, dtype={'id_str': str, 'user_id_str': str})
+        report = build_report(results_df)
+    _, paths = write_report(results_df, run_id, output_dir, report=report)
+    for kind, written in paths.items():
+        print(f"📄 {kind}: {written}")
+
+
+if __name__ == "__main__":
+    main()
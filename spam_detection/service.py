@@ -0,0 +1,420 @@
+"""
+Layanan scoring streaming untuk tweet yang baru di-crawl.
+
+Tweet dikirim terus-menerus (HTTP `POST /tweets` atau `submit` dari Python),
+dikumpulkan menjadi micro-batch, lalu melewati jalur yang sama dengan notebook:
+prefilter lokal -> cache -> LLM (BatchClassifier). Hasil di-append ke dataset
+Parquet `Output/deteksi_spam_detail_<run_id>/` dan dicatat di manifest, sehingga
+dashboard melihat hasil baru dalam hitungan detik. Antrean dibatasi: saat penuh,
+HTTP menjawab 429 (+ Retry-After) dan `submit` menunggu (backpressure). Buffer
+hasil yang belum tersimpan juga dibatasi (`max_pending` baris): selama flush
+gagal dan buffer penuh, worker berhenti mengambil batch dan HTTP menjawab 429.
+
+    python -m spam_detection.service --backend stub --port 8080
+    curl -X POST localhost:8080/tweets -d '[{"id_str": "1", "full_text": "..."}]'
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+from datetime import datetime
+
+import pandas as pd
+
+from .checkpoint import RESULT_COLUMNS
+from .ingest import SeenIndex
+from .metrics import REGISTRY
+from .prefilter import local_result
+from .registry import OUTPUT_DIR, TIMESTAMP_FORMAT, record_artifact
+from .storage import append_results, compact_results
+
+# Kolom tweet yang disimpan bersama hasil (sisanya diabaikan)
+TWEET_COLUMNS = ["id_str", "created_at", "username", "full_text"]
+MIN_TEXT_LENGTH = 5  # sama dengan `preprocess_text_spam` di notebook
+
+logger = logging.getLogger(__name__)
+
+_STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+                429: "Too Many Requests"}
+
+
+class QueueFull(Exception):
+    """Antrean (atau buffer hasil) tidak cukup untuk menampung tweet dalam satu request."""
+
+
+def _score_batch(tweets, classifier, prefilter=None):
+    """
+    Klasifikasi satu micro-batch (list dict tweet). Return DataFrame hasil
+    dengan kolom yang sama seperti `results_df` di notebook.
+    """
+    df = pd.DataFrame.from_records(tweets).reindex(columns=TWEET_COLUMNS).astype("string")
+    text = df["full_text"].str.strip()
+    df["processed_text"] = text.where(text.str.len() >= MIN_TEXT_LENGTH)
+    df = df[df["processed_text"].notna()].reset_index(drop=True)
+    REGISTRY.inc('service_skipped_total', len(tweets) - len(df))
+    if df.empty:
+        return df
+
+    results = [None] * len(df)
+    pending = list(range(len(df)))
+    if prefilter is not None:
+        decisions = prefilter.decide(df, text_col="processed_text")
+        for i, label, score, indicators in zip(range(len(df)), decisions["prefilter_label"],
+                                                decisions["prefilter_score"], decisions["prefilter_indicators"]):
+            if label is not None:
+                results[i] = local_result(label, score, indicators)
+        pending = [i for i in pending if results[i] is None]
+    texts = df["processed_text"].tolist()
+    for i, result in zip(pending, classifier.classify([texts[i] for i in pending], progress=False)):
+        results[i] = result
+
+    for key, column in RESULT_COLUMNS.items():
+        df[column] = [result.get(key) for result in results]
+    return df
+
+
+class ScoringService:
+    """
+    Layanan asyncio: antrean terbatas -> `concurrency` worker micro-batch ->
+    buffer hasil yang di-flush ke dataset setiap `flush_interval` detik.
+    `classifier` adalah BatchClassifier (bisa sudah dibungkus LLMCache).
+    Buffer hasil dibatasi `max_pending` baris (default: `max_queue`), plus paling
+    banyak satu batch per worker yang sudah menunggu antrean.
+    """
+
+    def __init__(self, classifier, prefilter=None, output_dir=OUTPUT_DIR, max_queue=10000,
+                 batch_size=64, max_wait=1.0, flush_interval=2.0, concurrency=2,
+                 compact_every=50, seen_index_path=None, max_pending=None):
+        self.classifier = classifier
+        self.prefilter = prefilter
+        self.output_dir = output_dir
+        self.max_queue = max_queue
+        self.max_pending = max_pending or max_queue
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.compact_every = compact_every
+        self.run_id = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.root = os.path.join(output_dir, f"deteksi_spam_detail_{self.run_id}")
+        self.seen = SeenIndex(seen_index_path or os.path.join(output_dir, "service.seen.sqlite"))
+        self.stats = {'received': 0, 'ignored': 0, 'rejected': 0, 'scored': 0, 'flushes': 0}
+        self._inflight = set()  # id yang sudah diterima tapi belum tersimpan
+        self._pending = []      # DataFrame hasil yang menunggu flush
+        self._pending_rows = 0
+        self._has_room = None   # Event: buffer hasil di bawah `max_pending`
+        self._stopping = False
+        self._queue = None
+        self._tasks = []
+        self._server = None
+        self._connections = set()
+
+    # ----- input -----
+
+    def _new_tweets(self, tweets):
+        """Buang tweet tanpa id/teks dan id yang sudah diterima atau tersimpan."""
+        fresh, batch_ids = [], set()
+        candidates = [t for t in tweets if isinstance(t, dict) and t.get("id_str") and t.get("full_text")]
+        candidate_ids = [str(t["id_str"]) for t in candidates if str(t["id_str"]) not in self._inflight]
+        stored = self.seen.seen(candidate_ids)
+        for tweet in candidates:
+            tweet_id = str(tweet["id_str"])
+            if tweet_id in self._inflight or tweet_id in stored or tweet_id in batch_ids:
+                continue
+            batch_ids.add(tweet_id)
+            fresh.append({**tweet, "id_str": tweet_id})
+        self.stats['ignored'] += len(tweets) - len(fresh)
+        return fresh
+
+    def _enqueue(self, tweet):
+        self._inflight.add(tweet["id_str"])
+        self._queue.put_nowait(tweet)
+
+    def accept(self, tweets):
+        """
+        Masukkan tweet ke antrean tanpa menunggu. Semua atau tidak sama sekali:
+        raise `QueueFull` jika sisa kapasitas kurang. Return jumlah tweet baru.
+        """
+        self.stats['received'] += len(tweets)
+        fresh = self._new_tweets(tweets)
+        if not fresh:
+            return 0
+        reason = None
+        if self.max_queue - self._queue.qsize() < len(fresh):
+            reason = f"antrean penuh ({self._queue.qsize()}/{self.max_queue})"
+        elif not self._has_room.is_set():
+            reason = f"hasil belum tersimpan ({self._pending_rows}/{self.max_pending} baris)"
+        if reason:
+            self.stats['rejected'] += len(fresh)
+            REGISTRY.inc('service_rejected_total', len(fresh))
+            raise QueueFull(reason)
+        for tweet in fresh:
+            self._enqueue(tweet)
+        REGISTRY.set('service_queue_depth', self._queue.qsize())
+        return len(fresh)
+
+    async def submit(self, tweets):
+        """Versi `accept` untuk producer di proses yang sama: menunggu saat antrean penuh."""
+        self.stats['received'] += len(tweets)
+        fresh = self._new_tweets(tweets)
+        for tweet in fresh:
+            self._inflight.add(tweet["id_str"])
+            await self._queue.put(tweet)
+        REGISTRY.set('service_queue_depth', self._queue.qsize())
+        return len(fresh)
+
+    # ----- pemrosesan -----
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _set_pending(self, frames):
+        """Ganti buffer hasil dan buka/tutup `_has_room` sesuai `max_pending`."""
+        self._pending = frames
+        self._pending_rows = sum(len(frame) for frame in frames)
+        REGISTRY.set('service_pending_rows', self._pending_rows)
+        if self._pending_rows < self.max_pending or self._stopping:
+            self._has_room.set()
+        else:
+            self._has_room.clear()
+
+    async def _worker(self):
+        while True:
+            # Backpressure: tunggu flush berhasil sebelum mengambil batch baru
+            await self._has_room.wait()
+            batch = await self._next_batch()
+            REGISTRY.set('service_queue_depth', self._queue.qsize())
+            try:
+                with REGISTRY.timer('service_batch_seconds'):
+                    scored = await asyncio.to_thread(_score_batch, batch, self.classifier, self.prefilter)
+            except Exception as e:
+                # Batch gagal dilepas dari inflight agar bisa dikirim ulang oleh crawler
+                REGISTRY.inc('service_batch_failures_total', type=type(e).__name__)
+                logger.warning("Micro-batch gagal (%d tweet): %s", len(batch), e)
+                self._inflight.difference_update(t["id_str"] for t in batch)
+            else:
+                skipped = {t["id_str"] for t in batch} - set(scored["id_str"])
+                self._inflight.difference_update(skipped)
+                if len(scored):
+                    self._set_pending(self._pending + [scored])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Append hasil yang terkumpul ke dataset, lalu catat id-nya di seen index."""
+        if not self._pending:
+            return 0
+        frames = self._pending
+        self._pending = []
+        results_df = pd.concat(frames, ignore_index=True)
+        first = self.stats['flushes'] == 0
+        try:
+            await asyncio.to_thread(append_results, results_df, self.root)
+        except Exception:
+            # Kembalikan ke depan buffer (sebelum hasil yang masuk selama append) agar flush berikutnya mengulang
+            self._set_pending(frames + self._pending)
+            raise
+        self._set_pending(self._pending)
+        if first:
+            record_artifact(self.output_dir, self.run_id, 'detail_dataset', self.root)
+        # Sama seperti ingest: data ditulis dulu baru id dicatat
+        ids = results_df["id_str"].tolist()
+        self.seen.add(ids, source=self.run_id)
+        self._inflight.difference_update(ids)
+        self.stats['scored'] += len(results_df)
+        self.stats['flushes'] += 1
+        REGISTRY.inc('service_scored_total', len(results_df))
+        if self.compact_every and self.stats['flushes'] % self.compact_every == 0:
+            await asyncio.to_thread(compact_results, self.root)
+        return len(results_df)
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                REGISTRY.inc('service_flush_failures_total', type=type(e).__name__)
+                logger.warning("Flush gagal, dicoba lagi: %s", e)
+
+    # ----- HTTP -----
+
+    def _route(self, method, path, body):
+        """Return (status, payload dict atau teks, header tambahan)."""
+        path = path.split("?")[0]
+        if method == "POST" and path == "/tweets":
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                return 400, {"error": "body harus JSON"}, {}
+            tweets = payload.get("tweets") if isinstance(payload, dict) and "tweets" in payload else payload
+            tweets = [tweets] if isinstance(tweets, dict) else tweets
+            if not isinstance(tweets, list):
+                return 400, {"error": "kirim list tweet atau {\"tweets\": [...]}"}, {}
+            try:
+                accepted = self.accept(tweets)
+            except QueueFull as e:
+                return 429, {"error": str(e)}, {"Retry-After": str(max(1, round(self.flush_interval)))}
+            return 202, {"accepted": accepted, "queue": self._queue.qsize()}, {}
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "run_id": self.run_id, "queue": self._queue.qsize(),
+                         "max_queue": self.max_queue, "pending": self._pending_rows, **self.stats}, {}
+        if method == "GET" and path == "/metrics":
+            return 200, REGISTRY.to_prometheus(), {}
+        return 404, {"error": "not found"}, {}
+
+    async def _handle(self, reader, writer):
+        """HTTP/1.1 minimal (Content-Length, keep-alive) di atas asyncio streams."""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload, extra = self._route(method, path, body)
+                if isinstance(payload, str):
+                    data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+                else:
+                    data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+                head = [f"HTTP/1.1 {status} {_STATUS_TEXT[status]}", f"Content-Type: {content_type}",
+                        f"Content-Length: {len(data)}", *(f"{k}: {v}" for k, v in extra.items())]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    # ----- siklus hidup -----
+
+    async def start(self, host="127.0.0.1", port=None):
+        """Mulai worker & flusher; buka server HTTP jika `port` diisi (0 = port bebas)."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._flusher()))
+        if port is not None:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()[:2] if self._server else None
+
+    async def stop(self):
+        """Tolak request baru, selesaikan antrean, flush terakhir, lalu tutup."""
+        if self._server is not None:
+            self._server.close()
+            # Koneksi keep-alive yang menganggur ditutup agar wait_closed tidak menunggu client
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        # Antrean tetap dikosongkan walau buffer penuh; sisanya ikut flush terakhir
+        self._stopping = True
+        self._has_room.set()
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.flush()
+        self.seen.close()
+
+
+async def serve(service, host="127.0.0.1", port=8080, stop_event=None):
+    """Jalankan `service` sampai `stop_event` di-set (SIGINT/SIGTERM saat dari CLI)."""
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    await service.start(host, port)
+    logger.info("Scoring service di http://%s:%d (run %s)", host, service.address[1], service.run_id)
+    await stop_event.wait()
+    logger.info("Menghentikan service, menyelesaikan antrean...")
+    await service.stop()
+    logger.info("%d tweet tersimpan di '%s'", service.stats['scored'], service.root)
+
+
+def main(argv=None):
+    import argparse
+
+    from .backends import make_llm
+    from .batch import BatchClassifier
+    from .cache import LLMCache
+    from .classifier import classify_tweet
+    from .metrics import METRICS_FILENAME, MetricsWriter
+    from .prefilter import Prefilter
+
+    parser = argparse.ArgumentParser(description="Scoring service deteksi spam (streaming)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--backend", default="stub", help="replicate | transformers | llama_cpp | http | stub")
+    parser.add_argument("--model", default=None, help="model id / path GGUF / URL (backend http)")
+    parser.add_argument("--cache", default="granite_cache.sqlite", help="kosongkan untuk tanpa cache")
+    parser.add_argument("--rate", type=float, default=5.0, help="request LLM per detik")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-wait", type=float, default=1.0)
+    parser.add_argument("--max-queue", type=int, default=10000)
+    parser.add_argument("--max-pending", type=int, default=None, help="batas baris hasil yang belum tersimpan")
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    llm_kwargs = {}
+    if args.backend == "http":
+        llm_kwargs["url"] = args.model
+    elif args.backend == "replicate":
+        llm_kwargs.update(model=args.model or "ibm-granite/granite-3.3-8b-instruct",
+                          api_token=os.environ.get("REPLICATE_API_TOKEN"),
+                          temperature=0.1, max_new_tokens=512)
+    elif args.backend != "stub" and args.model:
+        llm_kwargs["model"] = args.model
+    llm = make_llm(args.backend, **llm_kwargs)
+
+    classify_fn = classify_tweet
+    if args.cache:
+        cache = LLMCache(args.cache, model_id=args.model or args.backend,
+                         model_kwargs={"temperature": 0.1, "max_new_tokens": 512})
+        classify_fn = cache.wrap(classify_tweet)
+    classifier = BatchClassifier(llm, max_workers=args.workers, rate_per_sec=args.rate, classify_fn=classify_fn)
+    os.makedirs(args.output_dir, exist_ok=True)
+    service = ScoringService(classifier, prefilter=Prefilter(spam_threshold=0.8), output_dir=args.output_dir,
+                             max_queue=args.max_queue, batch_size=args.batch_size, max_wait=args.max_wait,
+                             flush_interval=args.flush_interval, max_pending=args.max_pending)
+    # Metrik live untuk halaman "📡 Run Monitor" di dashboard
+    with MetricsWriter(os.path.join(args.output_dir, METRICS_FILENAME), run_id=service.run_id):
+        asyncio.run(serve(service, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
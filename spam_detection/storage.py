@@ -0,0 +1,359 @@
+"""
+Penyimpanan hasil deteksi dalam format kolumnar (Parquet/Arrow).
+
+Layout satu run:
+
+    Output/deteksi_spam_detail_<timestamp>/
+        detections/created_date=YYYY-MM-DD/*.parquet   # kolom ringan & bertipe
+        texts/*.parquet                                # kolom teks besar (side table)
+
+`spam_classification` disimpan sebagai dictionary/categorical, `confidence_score`
+sebagai int8, dan `spam_indicators` sebagai list<string> sehingga pembaca tidak
+perlu `eval` lagi. Pembaca cukup memuat kolom yang dibutuhkan (memory-mapped).
+"""
+
+import ast
+import json
+import os
+import shutil
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from .metrics import REGISTRY
+
+DETECTIONS_DIR = "detections"
+# File hasil `compact_results`; metadata COMPACTED_FROM = nama file sumber (JSON)
+COMPACTED_SUFFIX = "-c.parquet"
+COMPACTED_FROM = b"compacted_from"
+COMPACTION_GRACE_SECONDS = 60
+TEXTS_DIR = "texts"
+ID_COL = "id_str"
+
+# Kolom teks besar yang dipisah ke side table
+TEXT_COLUMNS = ["full_text", "spam_reason", "full_analysis"]
+
+_MONTHS = {m: f"{i:02d}" for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+
+
+def parse_indicators(values):
+    """
+    Ubah kolom indikator (list, atau teks hasil `str(list)` dari CSV lama)
+    menjadi list of string. Parsing dilakukan sekali per nilai unik dengan
+    `ast.literal_eval` (aman, bukan `eval`).
+    """
+    values = pd.Series(values)
+
+    def _parse(value):
+        if isinstance(value, (list, tuple)):
+            return [str(v) for v in value]
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return []
+        text = str(value).strip()
+        if text.startswith("["):
+            try:
+                parsed = ast.literal_eval(text)
+                if isinstance(parsed, (list, tuple)):
+                    return [str(v) for v in parsed]
+            except (ValueError, SyntaxError):
+                pass
+        return [text] if text else []
+
+    if values.map(lambda v: isinstance(v, (list, tuple))).all():
+        return values.map(_parse)
+    keys = values.astype(str)
+    mapping = {key: _parse(value) for key, value in zip(keys.drop_duplicates(), values[~keys.duplicated()])}
+    return keys.map(mapping)
+
+
+def parse_created_at(values):
+    """
+    Parse format waktu Twitter ("Mon Aug 25 23:59:31 +0000 2025") ke datetime UTC.
+    Teks disusun ulang menjadi ISO-8601 dengan operasi string vektor karena
+    `strptime` per baris terlalu lambat untuk jutaan tweet.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        # Sudah di-parse (mis. oleh `ingest.read_crawl_file`)
+        return values if values.dt.tz is not None else values.dt.tz_localize("UTC")
+    values = values.astype("string")
+    iso = (values.str.slice(26, 30) + "-" + values.str.slice(4, 7).map(_MONTHS) + "-"
+           + values.str.slice(8, 10) + "T" + values.str.slice(11, 19) + values.str.slice(20, 25))
+    parsed = pd.to_datetime(iso, format="ISO8601", errors="coerce", utc=True)
+    fallback = parsed.isna() & values.notna()
+    if fallback.any():
+        parsed[fallback] = pd.to_datetime(values[fallback], errors="coerce", utc=True)
+    return parsed
+
+
+def to_columnar(results_df):
+    """
+    Pisahkan `results_df` menjadi (detections, texts) dengan tipe kolom yang
+    ringkas. `id_str` selalu string agar id 19 digit tidak kehilangan presisi.
+    """
+    df = results_df.copy()
+    df[ID_COL] = df[ID_COL].astype(str)
+    if "spam_classification" in df:
+        df["spam_classification"] = df["spam_classification"].astype(
+            pd.CategoricalDtype(["Not Spam", "Spam"]))
+    if "confidence_score" in df:
+        df["confidence_score"] = pd.to_numeric(df["confidence_score"], errors="coerce").round().astype("Int8")
+    if "spam_indicators" in df:
+        df["spam_indicators"] = parse_indicators(df["spam_indicators"]).to_numpy()
+    if "created_at" in df:
+        df["created_at"] = parse_created_at(df["created_at"])
+        # Format tanggal per nilai unik saja (strftime per baris mahal)
+        codes, days = pd.factorize(df["created_at"].dt.floor("D"))
+        labels = pd.Index(days.strftime("%Y-%m-%d").tolist() + ["unknown"])
+        df["created_date"] = labels[codes].to_numpy()
+
+    text_cols = [c for c in TEXT_COLUMNS if c in df.columns]
+    texts = df[[ID_COL, *text_cols]]
+    detections = df.drop(columns=text_cols)
+    return detections, texts
+
+
+def _detections_table(detections):
+    det_table = pa.Table.from_pandas(detections, preserve_index=False)
+    if "spam_indicators" in detections:
+        # Pastikan tipe list<string> walau semua list kosong
+        det_table = det_table.set_column(
+            det_table.schema.get_field_index("spam_indicators"), "spam_indicators",
+            pa.array(detections["spam_indicators"].tolist(), type=pa.list_(pa.string())),
+        )
+    return det_table
+
+
+def write_results(results_df, root):
+    """
+    Tulis hasil run ke dataset Parquet di direktori `root` (isi lama diganti
+    seluruhnya). Dataset ditulis ke direktori tersembunyi di sebelah `root`
+    lalu ditukar dengan rename, sehingga partisi `created_date=` lama tidak
+    tertinggal. Return `root`.
+    """
+    with REGISTRY.timer('export_seconds', format='parquet'):
+        detections, texts = to_columnar(results_df)
+        parent, name = os.path.split(os.path.abspath(root))
+        token = uuid.uuid4().hex
+        staging = os.path.join(parent, f".{name}.tmp-{token}")
+        old = os.path.join(parent, f".{name}.old-{token}")
+        partitioning = ["created_date"] if "created_date" in detections else None
+        try:
+            pq.write_to_dataset(_detections_table(detections), os.path.join(staging, DETECTIONS_DIR),
+                                partition_cols=partitioning)
+            os.makedirs(os.path.join(staging, TEXTS_DIR), exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(texts, preserve_index=False),
+                           os.path.join(staging, TEXTS_DIR, "part-0.parquet"))
+            if os.path.exists(root):
+                os.replace(root, old)
+            try:
+                os.replace(staging, root)
+            except OSError:
+                if os.path.exists(old):
+                    os.replace(old, root)  # kembalikan dataset lama
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+    return root
+
+
+def _publish(staging, root):
+    """Pindahkan semua file di `staging` ke posisi relatif yang sama di `root` (rename atomik)."""
+    for directory, _, files in os.walk(staging):
+        target = os.path.join(root, os.path.relpath(directory, staging))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            os.replace(os.path.join(directory, name), os.path.join(target, name))
+
+
+def append_results(results_df, root):
+    """
+    Tambahkan hasil ke dataset `root` sebagai file Parquet baru tanpa menyentuh
+    file lama. File ditulis dulu ke `root/_staging` (diabaikan pembaca dataset)
+    lalu di-rename, sehingga pembaca tidak pernah melihat file setengah jadi.
+    """
+    with REGISTRY.timer('export_seconds', format='parquet_append'):
+        detections, texts = to_columnar(results_df)
+        token = uuid.uuid4().hex
+        staging = os.path.join(root, "_staging", token)
+        partitioning = ["created_date"] if "created_date" in detections else None
+        pq.write_to_dataset(_detections_table(detections), os.path.join(staging, DETECTIONS_DIR),
+                            partition_cols=partitioning, basename_template=f"part-{token}-{{i}}.parquet")
+        os.makedirs(os.path.join(staging, TEXTS_DIR), exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(texts, preserve_index=False),
+                       os.path.join(staging, TEXTS_DIR, f"part-{token}.parquet"))
+        _publish(staging, root)
+        shutil.rmtree(staging)
+    return root
+
+
+def _parquet_names(files):
+    return sorted(f for f in files if f.endswith(".parquet") and not f.startswith(("_", ".")))
+
+
+def _source_map(directory, names):
+    """{file compaction (`*-c.parquet`) yang masih ada: set nama file sumbernya}."""
+    sources = {}
+    for name in names:
+        if not name.endswith(COMPACTED_SUFFIX):
+            continue
+        try:
+            metadata = pq.read_schema(os.path.join(directory, name)).metadata or {}
+        except FileNotFoundError:
+            continue
+        sources[name] = set(json.loads(metadata.get(COMPACTED_FROM, b"[]")))
+    return sources
+
+
+def _compacted_sources(directory, names):
+    """Nama file di `directory` yang sudah tercakup file compaction (`*-c.parquet`)."""
+    return set().union(*_source_map(directory, names).values())
+
+
+def _remove_expired_sources(directory, sources, cutoff):
+    """
+    Hapus sumber dari file compaction yang dibuat sebelum `cutoff`. Sumber yang
+    juga file compaction (compaction berantai) baru dihapus setelah semua
+    sumbernya sendiri hilang; jika lebih dulu, sumber lamanya terbaca lagi
+    sebagai file hidup dan barisnya ganda.
+    """
+    expired = set()
+    for name, names in sources.items():
+        try:
+            if os.path.getmtime(os.path.join(directory, name)) <= cutoff:
+                expired |= names
+        except FileNotFoundError:
+            continue
+    pending = sorted(expired)
+    while pending:
+        blocked = [name for name in pending
+                   if any(os.path.exists(os.path.join(directory, s)) for s in sources.get(name, ()))]
+        for name in set(pending) - set(blocked):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+        if len(blocked) == len(pending):
+            break
+        pending = blocked
+
+
+def _live_files(base):
+    """
+    File Parquet yang berlaku di bawah `base`: tanpa staging/tmp (`_`/`.`) dan tanpa
+    file sumber yang sudah digantikan file compaction (meski belum dihapus).
+    """
+    live = []
+    for directory, dirs, files in os.walk(base):
+        dirs[:] = [d for d in dirs if not d.startswith(("_", "."))]
+        names = _parquet_names(files)
+        covered = _compacted_sources(directory, names)
+        live += [os.path.join(directory, name) for name in names if name not in covered]
+    return live
+
+
+def compact_results(root, min_files=16, max_file_bytes=64 * 2 ** 20, grace_seconds=COMPACTION_GRACE_SECONDS):
+    """
+    Gabungkan file kecil hasil `append_results` (per direktori partisi) menjadi
+    satu file agar jumlah file yang dibaca dashboard tidak terus bertambah.
+    File di atas `max_file_bytes` (hasil compaction sebelumnya) tidak dibaca ulang.
+
+    File gabungan mencatat nama sumbernya di metadata Parquet dan muncul lewat satu
+    rename atomik; sejak itu pembaca (`_live_files`) mengabaikan sumbernya, jadi tidak
+    ada baris ganda. Sumber baru dihapus pada compaction berikutnya setelah
+    `grace_seconds`, agar pembaca yang sudah mendaftar file lama tetap bisa membukanya.
+    Return jumlah file yang digabung.
+    """
+    merged = 0
+    cutoff = time.time() - grace_seconds
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(("_", "."))]
+        # Semua set sumber dibaca dulu, sebelum ada file yang dihapus
+        _remove_expired_sources(directory, _source_map(directory, _parquet_names(files)), cutoff)
+
+        names = _parquet_names(os.listdir(directory))
+        covered = _compacted_sources(directory, names)
+        paths = [os.path.join(directory, name) for name in names if name not in covered]
+        paths = [p for p in paths if os.path.exists(p) and os.path.getsize(p) < max_file_bytes]
+        if len(paths) < min_files:
+            continue
+        table = pa.concat_tables([pq.ParquetFile(p).read() for p in paths], promote_options="default")
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            COMPACTED_FROM: json.dumps([os.path.basename(p) for p in paths]),
+        })
+        token = uuid.uuid4().hex
+        tmp_path = os.path.join(directory, f"_compact-{token}.parquet")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(directory, f"part-{token}{COMPACTED_SUFFIX}"))
+        merged += len(paths)
+    return merged
+
+
+def _dataset(root, subdir):
+    base = os.path.abspath(os.path.join(root, subdir))
+    return ds.dataset(_live_files(base), format="parquet", partitioning="hive",
+                      partition_base_dir=base, filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+def _read_table(root, subdir, columns=None, filter=None, attempts=3):
+    """
+    `to_table` dengan daftar file ulang jika file hilang di tengah baca (sumber
+    compaction yang dihapus setelah masa tenggang). `columns` = None atau list.
+    """
+    for attempt in range(attempts):
+        dataset = _dataset(root, subdir)
+        names = dataset.schema.names
+        wanted = None if columns is None else [c for c in columns if c in names]
+        try:
+            return dataset.to_table(columns=wanted, filter=filter)
+        except FileNotFoundError:
+            if attempt == attempts - 1:
+                raise
+
+
+def read_results(root, columns=None, filter=None):
+    """
+    Baca tabel deteksi (tanpa kolom teks besar). `columns` membatasi kolom yang
+    dimuat; `filter` berupa ekspresi `pyarrow.dataset` (mis. `ds.field(...) == ...`).
+    """
+    return _read_table(root, DETECTIONS_DIR, columns, filter).to_pandas()
+
+
+def iter_results(root, columns=None, batch_size=65536, filter=None):
+    """Baca tabel deteksi per batch (DataFrame) agar memori tetap konstan."""
+    dataset = _dataset(root, DETECTIONS_DIR)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    for batch in dataset.to_batches(columns=columns, filter=filter, batch_size=batch_size):
+        yield batch.to_pandas()
+
+
+def read_texts(root, columns=None, ids=None):
+    """Baca side table teks besar, opsional hanya untuk `ids` tertentu."""
+    filter = ds.field(ID_COL).isin([str(i) for i in ids]) if ids is not None else None
+    if columns is not None:
+        columns = [ID_COL, *[c for c in columns if c != ID_COL]]
+    return _read_table(root, TEXTS_DIR, columns, filter).to_pandas()
+
+
+def csv_to_dataset(csv_path, root=None):
+    """Konversi `deteksi_spam_detail_*.csv` lama menjadi dataset Parquet."""
+    if root is None:
+        root = os.path.splitext(csv_path)[0]
+    df = pd.read_csv(csv_path, dtype={ID_COL: str, "conversation_id_str": str, "user_id_str": str})
+    return write_results(df, root)
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        print(f"💾 {path} -> {csv_to_dataset(path)}")
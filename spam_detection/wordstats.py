@@ -0,0 +1,228 @@
+"""
+Statistik frekuensi kata per kelas (Spam / Not Spam) secara streaming.
+
+Pengganti `preprocess_for_wordcloud` + `Counter` di cell Word Cloud notebook:
+tweet diproses per chunk dengan tokenizer yang sudah dikompilasi, dan hitungan
+per kelas disimpan di counter Space-Saving berkapasitas tetap sehingga memori
+konstan berapa pun jumlah tweet. Hasil parsial dari worker paralel bisa
+digabung (`merge`), lalu JSON dan word cloud dibuat dari hitungan gabungan.
+"""
+
+import heapq
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+import pandas as pd
+
+# Stopwords Bahasa Indonesia + istilah social media (dari cell Word Cloud)
+STOPWORDS_ID = frozenset([
+    # Stopwords bahasa Indonesia umum
+    'sih', 'nya', 'dan', 'yg', 'di', 'dari', 'ke', 'ini', 'itu', 'atau', 'pada',
+    'dengan', 'yang', 'untuk', 'juga', 'akan', 'adalah', 'tersebut', 'karena',
+    'seperti', 'ada', 'tidak', 'bisa', 'sudah', 'baru', 'masih', 'harus', 'jadi',
+    'kalo', 'kalau', 'tapi', 'dulu', 'sekarang', 'nanti', 'aja', 'saja', 'kok',
+    'dong', 'lah', 'kan', 'gak', 'ga', 'ngga', 'enggak', 'udah', 'udh',
+
+    # Kata-kata social media umum
+    'rt', 'via', 'amp', 'follow', 'followers', 'following', 'tweet', 'twitter',
+    'instagram', 'facebook', 'whatsapp', 'line', 'telegram',
+
+    # Kata-kata teknis Twitter
+    'https', 'http', 'www', 'co', 'id', 'com', 'net', 'org', 'pic',
+
+    # Kata sambung dan penghubung
+    'bahwa', 'bahkan', 'namun', 'tetapi', 'walau', 'walaupun', 'meskipun',
+    'sedangkan', 'sementara', 'kemudian', 'lalu', 'selanjutnya'
+])
+
+# Satu regex: URL/mention/hashtag dicocokkan tapi dibuang (grup kosong), token =
+# deretan huruf minimal `min_len` (angka & tanda baca jadi pemisah)
+_SKIP = r"https?://\S+|www\S+|[@#]\w+"
+
+
+@lru_cache(maxsize=None)
+def _token_re(min_len):
+    return re.compile(rf"{_SKIP}|([^\W\d_]{{{min_len},}})")
+
+
+def tokenize(text, stopwords=STOPWORDS_ID, min_len=3):
+    """Tokenisasi satu teks (lowercase, tanpa URL/mention/hashtag/stopwords)."""
+    tokens = _token_re(min_len).findall(str(text).lower())
+    return [t for t in tokens if t and t not in stopwords]
+
+
+def count_words(texts, stopwords=STOPWORDS_ID, min_len=3):
+    """
+    Hitung kata dalam sekumpulan teks. Teks digabung dulu sehingga regex jalan
+    sekali per chunk, dan stopwords disaring per kosakata, bukan per token.
+    """
+    joined = "\n".join(pd.Series(texts, dtype=object).dropna().astype(str).tolist())
+    counts = Counter(_token_re(min_len).findall(joined.lower()))
+    for word in [w for w in counts if not w or w in stopwords]:
+        del counts[word]
+    return counts
+
+
+class SpaceSaving:
+    """
+    Counter top-k Space-Saving dengan `capacity` slot. Hitungan bisa
+    overestimate paling banyak `error[word]` (<= hitungan minimum saat kata
+    masuk); kata dengan frekuensi > N/capacity dijamin tercatat.
+    """
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+
+    @property
+    def min_count(self):
+        """Hitungan minimum jika summary penuh (batas overestimate kata baru), selain itu 0."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def update(self, counts):
+        """Tambahkan hitungan eksak (mis. `Counter` satu chunk) ke summary."""
+        return self._combine(counts, {}, 0, sum(counts.values()))
+
+    def merge(self, other):
+        """
+        Gabungkan summary lain (mergeable summaries, Agarwal et al.): kata yang
+        tidak ada di salah satu sisi dianggap bernilai `min_count` sisi itu.
+        """
+        return self._combine(other.counts, other.errors, other.min_count, other.total)
+
+    def _combine(self, counts, errors, other_min, other_total):
+        own_min = self.min_count
+        merged, merged_errors = {}, {}
+        for word in self.counts.keys() | counts.keys():
+            c1 = self.counts.get(word)
+            c2 = counts.get(word)
+            merged[word] = (own_min if c1 is None else c1) + (other_min if c2 is None else c2)
+            merged_errors[word] = ((own_min if c1 is None else self.errors[word])
+                                   + (other_min if c2 is None else errors.get(word, 0)))
+        if len(merged) > self.capacity:
+            keep = heapq.nlargest(self.capacity, merged, key=merged.get)
+            merged = {w: merged[w] for w in keep}
+            merged_errors = {w: merged_errors[w] for w in keep}
+        self.counts, self.errors = merged, merged_errors
+        self.total += other_total
+        return self
+
+    def top(self, n=20):
+        """`n` kata teratas sebagai list (kata, hitungan)."""
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class WordStats:
+    """Counter Space-Saving per kelas + jumlah tweet per kelas; bisa di-merge."""
+
+    def __init__(self, capacity=5000, stopwords=STOPWORDS_ID, min_len=3):
+        self.capacity = capacity
+        self.stopwords = stopwords
+        self.min_len = min_len
+        self.counters = {}
+        self.tweets = Counter()
+
+    def update(self, texts, labels):
+        """Proses satu chunk tweet beserta label klasifikasinya."""
+        texts = pd.Series(texts).fillna("").astype(str).to_numpy(dtype=object)
+        codes, uniques = pd.factorize(pd.Series(labels).to_numpy(dtype=object))
+        for code, label in enumerate(uniques):
+            group = texts[codes == code]
+            counts = count_words(group, self.stopwords, self.min_len)
+            self.counters.setdefault(label, SpaceSaving(self.capacity)).update(counts)
+            self.tweets[label] += len(group)
+        return self
+
+    def merge(self, other):
+        """Gabungkan hasil parsial (mis. dari worker lain) ke objek ini."""
+        for label, counter in other.counters.items():
+            self.counters.setdefault(label, SpaceSaving(self.capacity)).merge(counter)
+        self.tweets.update(other.tweets)
+        return self
+
+    def top(self, label, n=20):
+        counter = self.counters.get(label)
+        return counter.top(n) if counter else []
+
+    def frequencies(self, label, n=100):
+        """Dict kata -> hitungan untuk `WordCloud.generate_from_frequencies`."""
+        return dict(self.top(label, n))
+
+    def summary(self, top_n=20):
+        """Ringkasan untuk `spam_word_analysis_*.json` (format sama dengan versi lama)."""
+        return {
+            'total_tweets': int(sum(self.tweets.values())),
+            'spam_tweets': int(self.tweets.get('Spam', 0)),
+            'not_spam_tweets': int(self.tweets.get('Not Spam', 0)),
+            'top_spam_words': self.top('Spam', top_n),
+            'top_not_spam_words': self.top('Not Spam', top_n)
+        }
+
+
+def _chunk_stats(texts, labels, capacity, stopwords, min_len):
+    return WordStats(capacity, stopwords, min_len).update(texts, labels)
+
+
+def iter_frames(df, chunksize=100000):
+    """Potong DataFrame yang sudah ada di memori menjadi chunk."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def compute_word_stats(chunks, text_col='processed_text', label_col='spam_classification',
+                       capacity=5000, stopwords=STOPWORDS_ID, min_len=3, workers=None):
+    """
+    Hitung `WordStats` dari iterable chunk DataFrame (`iter_frames`,
+    `pd.read_csv(chunksize=...)`, atau `storage.iter_results`). Dengan
+    `workers` > 1 chunk diproses paralel di beberapa proses dan hasilnya
+    di-merge; jumlah chunk yang sedang diproses dibatasi agar memori konstan.
+    """
+    stats = WordStats(capacity, stopwords, min_len)
+    if not workers or workers <= 1:
+        for chunk in chunks:
+            stats.update(chunk[text_col], chunk[label_col])
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.merge(future.result())
+            pending.add(executor.submit(_chunk_stats, chunk[text_col].tolist(), chunk[label_col].tolist(),
+                                        capacity, stopwords, min_len))
+        for future in pending:
+            stats.merge(future.result())
+    return stats
+
+
+def word_stats_from_path(path, chunksize=100000, **kwargs):
+    """Word stats langsung dari CSV hasil deteksi atau dataset Parquet (streaming)."""
+    columns = [kwargs.get('text_col', 'processed_text'), kwargs.get('label_col', 'spam_classification')]
+    if os.path.isdir(path):
+        from .storage import iter_results
+
+        chunks = iter_results(path, columns=columns, batch_size=chunksize)
+    else:
+        chunks = pd.read_csv(path, usecols=columns, chunksize=chunksize)
+    return compute_word_stats(chunks, **kwargs)
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        stats = word_stats_from_path(path, workers=os.cpu_count())
+        print(json.dumps(stats.summary(), indent=2, ensure_ascii=False))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Paket diimpor dari root repo tanpa perlu `pip install`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+
+import pytest
+
+from spam_detection.backends import StubHTTPError, StubLLM
+from spam_detection.batch import BatchClassifier, TokenBucket, is_retryable, retry_after
+from spam_detection.cache import LLMCache
+from spam_detection.classifier import (BATCH_PROMPT_VERSION, PROMPT_VERSION, build_prompt, classify_batch,
+                                       classify_tweet, parse_batch_response)
+
+
+class PartlyInvalidLLM(StubLLM):
+    """Jawaban batch tanpa item pertama; prompt tunggal gagal 429 sekali per teks."""
+
+    def __init__(self):
+        super().__init__(latency=0)
+        self.single_calls = 0
+        self.failed = set()
+
+    def invoke(self, prompt):
+        response = super().invoke(prompt)
+        if response.startswith("["):
+            return json.dumps(json.loads(response)[1:])
+        self.single_calls += 1
+        if prompt not in self.failed:
+            self.failed.add(prompt)
+            raise StubHTTPError(429, "Too Many Requests")
+        return response
+
+
+def test_invalid_batch_items_go_through_limiter_and_retry(tmp_path):
+    llm = PartlyInvalidLLM()
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), model_id="stub")
+    classifier = BatchClassifier(llm, max_workers=2, rate_per_sec=1000, base_delay=0, batch_size=4,
+                                 classify_fn=cache.wrap(classify_tweet), batch_fn=cache.wrap_batch(classify_batch))
+    texts = [f"promo gratis nomor {i} https://bit.ly/{i}" for i in range(8)]
+    results = classifier.classify(texts, progress=False)
+
+    assert all(r['classification'] == "Spam" and not r.get('error') for r in results)
+    assert llm.single_calls == 4           # item pertama dari 2 batch, masing-masing 429 sekali
+    assert classifier.stats['retries'] == 2
+    assert classifier.stats['calls'] == 2 + 4
+    # Hasil prompt tunggal disimpan dengan kunci versi prompt tunggal
+    assert cache.get(texts[0], PROMPT_VERSION) is not None
+    assert cache.get(texts[0], BATCH_PROMPT_VERSION) is None
+    assert cache.get(texts[1], BATCH_PROMPT_VERSION) is not None
+    cache.close()
+
+
+def test_results_keep_input_order():
+    llm = StubLLM(latency=0.001, jitter=0.01, seed=1)
+    texts = [f"tweet {i}" + (" https://x.co/a" if i % 3 == 0 else "") for i in range(60)]
+    results = BatchClassifier(llm, max_workers=8, rate_per_sec=10000).classify(texts, progress=False)
+    assert [r['classification'] for r in results] == ["Spam" if i % 3 == 0 else "Not Spam" for i in range(60)]
+
+
+def test_non_retryable_error_becomes_error_result():
+    class BrokenLLM:
+        def invoke(self, prompt):
+            raise StubHTTPError(400, "Bad Request")
+
+    classifier = BatchClassifier(BrokenLLM(), rate_per_sec=1000)
+    [result] = classifier.classify(["halo"], progress=False)
+    assert result['error'] and result['reason'].startswith("Error:")
+    assert classifier.stats == {'calls': 1, 'retries': 0, 'errors': 1}
+    assert classifier.errors[0]['tweet_index'] == 0
+
+
+def test_error_log_is_bounded():
+    class BrokenLLM:
+        def invoke(self, prompt):
+            raise StubHTTPError(400, "Bad Request")
+
+    classifier = BatchClassifier(BrokenLLM(), rate_per_sec=10000, max_errors=3)
+    classifier.classify([f"tweet {i}" for i in range(10)], progress=False)
+    assert classifier.stats['errors'] == 10
+    assert len(classifier.errors) == 3
+
+
+
+def test_single_prompt_keeps_notebook_layout():
+    # Prompt "v1" harus identik dengan notebook asli: baris diawali 8 spasi
+    prompt = build_prompt("halo")
+    assert prompt.startswith("\n        Tugas: Analisis tweet") and prompt.endswith("\n        ")
+    assert all(line.startswith(" " * 8) for line in prompt.split("\n") if line)
+    assert '\n        Tweet: "halo"\n' in prompt and "\n        10. Mengandung kata spam umum" in prompt
+
+def test_retry_helpers():
+    assert is_retryable(StubHTTPError(429)) and is_retryable(StubHTTPError(503))
+    assert not is_retryable(StubHTTPError(400))
+    assert is_retryable(RuntimeError("Rate limit exceeded"))
+    err = StubHTTPError(429)
+    err.retry_after = "2"
+    assert retry_after(err) == 2.0
+
+
+def test_token_bucket_rate_and_aimd():
+    bucket = TokenBucket(50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - start == pytest.approx(0.2, abs=0.1)
+
+    bucket.slow_down()
+    assert bucket.rate == 25
+    for _ in range(100):
+        bucket.slow_down()
+    assert bucket.rate == bucket.min_rate
+    for _ in range(100):
+        bucket.speed_up()
+    assert bucket.rate == bucket.max_rate
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_token_bucket_is_thread_safe():
+    bucket = TokenBucket(1000, capacity=5)
+    acquired = []
+    threads = [threading.Thread(target=lambda: [bucket.acquire() or acquired.append(1) for _ in range(20)])
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(acquired) == 100
+
+
+def test_parse_batch_response_validation():
+    response = 'teks pembuka [{"id": "t0", "klasifikasi": "Spam", "skor": "9", "indikator": "1", "alasan": "x"},' \
+               ' {"id": "t1", "klasifikasi": "Mungkin", "skor": 5, "indikator": [], "alasan": "x"},' \
+               ' {"id": "t9", "klasifikasi": "Spam", "skor": 5, "indikator": [], "alasan": "x"}] penutup'
+    results, invalid = parse_batch_response(response, ["t0", "t1", "t2"])
+    assert results["t0"]['confidence_score'] == 9 and results["t0"]['indicators'] == ["1"]
+    assert invalid == ["t1", "t2"]
+    assert parse_batch_response("bukan json", ["t0"]) == ({}, ["t0"])
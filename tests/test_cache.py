@@ -0,0 +1,83 @@
+import sqlite3
+
+from spam_detection.backends import StubLLM
+from spam_detection.cache import LLMCache, make_key, normalize_text
+from spam_detection.classifier import classify_tweet, parse_response
+
+
+def _result(label="Spam"):
+    return {'classification': label, 'confidence_score': 8, 'indicators': ["1, 2"],
+            'reason': "alasan", 'full_response': "..."}
+
+
+def test_hit_does_not_hold_write_lock(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path, model_id="granite")
+    cache.put("halo dunia", _result())
+    assert cache.get("halo dunia")['classification'] == "Spam"
+    assert not cache._conn.in_transaction
+
+    # Proses lain tetap bisa menulis ke file yang sama
+    other = sqlite3.connect(path, timeout=0.1)
+    other.execute("INSERT INTO llm_cache(key, created_at, last_access) VALUES ('x', 0, 0)")
+    other.commit()
+    other.close()
+    cache.close()
+
+
+def test_last_access_is_persisted_on_close(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMCache(path, model_id="granite")
+    cache.put("halo dunia", _result())
+    before = sqlite3.connect(path).execute("SELECT last_access FROM llm_cache").fetchone()[0]
+    cache.get("halo dunia")
+    cache.close()
+    after = sqlite3.connect(path).execute("SELECT last_access FROM llm_cache").fetchone()[0]
+    assert after > before
+
+
+def test_lru_eviction_uses_pending_touches(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), model_id="granite", max_entries=1)
+    cache.put("lama", _result())
+    cache.put("baru", _result())
+    cache.get("lama")  # "lama" jadi yang terakhir diakses
+    assert cache.evict() == 1
+    assert cache.get("lama") is not None and cache.get("baru") is None
+    cache.close()
+
+
+def test_parser_fallback_is_not_cached(tmp_path):
+    class FlakyLLM:
+        def __init__(self):
+            self.calls = 0
+
+        def invoke(self, prompt):
+            self.calls += 1
+            return "maaf, format rusak" if self.calls == 1 else StubLLM(latency=0).invoke(prompt)
+
+    llm = FlakyLLM()
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), model_id="granite")
+    classify = cache.wrap(classify_tweet)
+    first = classify("klik promo gratis https://bit.ly/x", llm)
+    assert first.get('fallback') and len(cache) == 0
+    second = classify("klik promo gratis https://bit.ly/x", llm)
+    assert second['classification'] == "Spam" and len(cache) == 1
+    assert classify("klik promo gratis https://bit.ly/x", llm) == second
+    assert llm.calls == 2
+    cache.close()
+
+
+def test_parse_response_marks_fallback_only_when_unparsed():
+    ok = parse_response("KLASIFIKASI: Spam\nSKOR: 9\nINDIKATOR: 1\nALASAN: link")
+    assert ok['classification'] == "Spam" and ok['confidence_score'] == 9 and 'fallback' not in ok
+    assert parse_response("KLASIFIKASI: Spam\nALASAN: tanpa skor").get('fallback')
+
+
+def test_key_normalization_and_versioning():
+    a = make_key("Promo  GRATIS https://t.co/aaa", "granite")
+    assert a == make_key("Promo GRATIS https://t.co/bbb", "granite")  # URL & spasi dinormalisasi
+    assert a != make_key("promo gratis https://t.co/aaa", "granite")  # ALL CAPS dipertahankan
+    assert a != make_key("Promo GRATIS https://t.co/aaa", "granite", prompt_version="v2")
+    assert a != make_key("Promo GRATIS https://t.co/aaa", "granite", {"temperature": 0.5})
+    assert normalize_text("ｆｕｌｌ width www.x.com") == "full width <URL>"
+    assert make_key("emoji \ud83d", "granite") != make_key("emoji", "granite")  # surrogate tunggal
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from spam_detection.checkpoint import ResultLog
+
+
+def _result(label, error=False):
+    return {'classification': label, 'confidence_score': 7, 'indicators': ["1"], 'reason': "x",
+            'full_response': "", 'error': error}
+
+
+def test_resume_skips_completed_and_retries_errors(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    log = ResultLog(path)
+    log.append("1", _result("Spam"))
+    log.append("2", _result("Error", error=True))
+    assert log.flush() == 2
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "3", "classifica')  # baris terpotong saat proses mati
+
+    resumed = ResultLog(path)
+    assert resumed.completed_ids() == {"1"}
+    assert resumed.completed_ids(retry_errors=False) == {"1", "2"}
+
+    resumed.append("2", _result("Not Spam"))
+    resumed.flush()
+    assert ResultLog(path).completed_ids() == {"1", "2"}
+
+
+def test_assemble_uses_last_result_and_keeps_order(tmp_path):
+    log = ResultLog(str(tmp_path / "results.jsonl"))
+    log.append("2", _result("Spam"))
+    log.append("1", _result("Spam"))
+    log.append("1", _result("Not Spam"))
+    log.flush()
+    valid_df = pd.DataFrame({"id_str": ["1", "2", "3"]})
+    results = log.assemble(valid_df)
+    assert results["id_str"].tolist() == ["1", "2", "3"]
+    assert results["spam_classification"].tolist()[:2] == ["Not Spam", "Spam"]
+    assert pd.isna(results["spam_classification"].iloc[2])
+    assert results["spam_indicators"].iloc[0] == "['1']"
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from spam_detection.dedup import MinHashLSH, assign_clusters, cluster_near_duplicates, propagate_labels
+
+TEMPLATE = "yuk daftar sekarang bonus saldo shopeepay gratis untuk pengguna baru kode {}"
+
+
+def test_chunked_signatures_match_single_text():
+    lsh = MinHashLSH(chunk_size=3)
+    texts = [TEMPLATE.format(i) for i in range(7)] + ["abc", ""]
+    signatures = lsh.signatures(texts)
+    assert signatures.shape == (9, 128) and signatures.dtype == np.uint32
+    for text, signature in zip(texts, signatures):
+        assert (lsh.signature(text) == signature).all()
+
+
+
+def test_lone_surrogates_do_not_break_shingling():
+    lsh = MinHashLSH(chunk_size=2)
+    texts = ["emoji terpotong \ud83d dari api", "emoji terpotong \ud83d dari api!", TEMPLATE.format(1)]
+    signatures = lsh.signatures(texts)
+    assert (lsh.signature(texts[0]) == signatures[0]).all()
+    assert np.mean(signatures[0] == signatures[1]) > 0.8
+
+def test_jaccard_estimate_tracks_similarity():
+    lsh = MinHashLSH()
+    a, b, c = lsh.signatures([TEMPLATE.format(1), TEMPLATE.format(2), "rapat paripurna dpr membahas anggaran negara"])
+    assert np.mean(a == b) > 0.8
+    assert np.mean(a == c) < 0.1
+
+
+def test_only_bucket_representatives_keep_signatures():
+    lsh = MinHashLSH()
+    ids = lsh.add_many([TEMPLATE.format(1), TEMPLATE.format(1), "rapat paripurna dpr membahas anggaran negara"])
+    assert list(ids) == [0, 1, 2]
+    # Dokumen 1 identik dengan 0: semua bucket-nya sudah punya anggota pertama
+    assert sorted(lsh._signatures) == [0, 2]
+    assert lsh.labels().tolist() == [0, 0, 2]
+
+
+def test_cluster_near_duplicates():
+    texts = [TEMPLATE.format(i) + f" https://t.co/{i}" for i in range(5)]
+    texts += ["Rapat DPR hari ini!", "rapat dpr hari ini", "https://t.co/x", "https://t.co/y", "ok"]
+    clusters = cluster_near_duplicates(texts)
+    assert clusters.tolist() == [0, 0, 0, 0, 0, 5, 5, 7, 8, 9]
+
+
+def test_assign_and_propagate_labels():
+    df = pd.DataFrame({"processed_text": [TEMPLATE.format(1), "rapat paripurna dpr", TEMPLATE.format(2)]})
+    clustered = assign_clusters(df)
+    assert clustered["cluster_size"].tolist() == [2, 1, 2]
+    assert clustered["is_representative"].tolist() == [True, True, False]
+
+    clustered["spam_classification"] = ["Spam", "Not Spam", None]
+    out = propagate_labels(clustered, ["spam_classification"])
+    assert out["spam_classification"].tolist() == ["Spam", "Not Spam", "Spam"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from spam_detection import explorer as explorer_module
+from spam_detection.explorer import Explorer, fts_terms
+
+
+def _frame():
+    texts = ["promo pulsa murah", "rapat dpr hari ini", "promo judi online", "rapat dpr hari ini",
+             "Promosi \"gratis\" ongkir", "kritik untuk dpr"]
+    return pd.DataFrame({
+        "processed_text": texts,
+        "spam_reason": ["link", "opini", "judi", "opini", "link", "opini"],
+        "spam_classification": ["Spam", "Not Spam", "Spam", "Not Spam", "Spam", "Not Spam"],
+        "confidence_score": [9, 2, 8, 3, 7, 1],
+        "username": ["a", "b", "a", "c", "d", "b"],
+    })
+
+
+def test_fts_terms_are_quoted_prefixes():
+    assert fts_terms('promo "gratis OR promo') == ['"promo"*', '"""gratis"*', '"OR"*']
+    assert fts_terms('  " ') == []
+
+
+def test_search_matches_prefix_and_all_terms():
+    explorer = Explorer(_frame())
+    assert explorer.search("prom").tolist() == [0, 2, 4]
+    assert explorer.search("dpr rapat").tolist() == [1, 3]
+    assert explorer.search("tidakada").tolist() == []
+    assert explorer.search("").tolist() == list(range(6))
+
+
+def test_query_applies_filters_before_search():
+    explorer = Explorer(_frame())
+    assert explorer.query(text="promo", min_confidence=8).tolist() == [0, 2]
+    assert explorer.query(text="dpr", username="@B").tolist() == [1, 5]
+    assert explorer.query(text="dpr", classification="Spam").tolist() == []
+    positions = np.array([1, 2, 5])
+    assert explorer.search("dpr", positions).tolist() == [1, 5]
+
+
+def test_posting_cache_is_bounded_lru(monkeypatch):
+    monkeypatch.setattr(explorer_module, "_POSTING_CACHE", 2)
+    explorer = Explorer(_frame())
+    for text in ["promo", "dpr", "promo", "rapat"]:
+        explorer.search(text)
+    assert list(explorer._postings) == ['"promo"*', '"rapat"*']
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from spam_detection.ingest import SeenIndex, ingest
+
+HEADER = "conversation_id_str,created_at,favorite_count,full_text,id_str,username\n"
+
+
+def _crawl(path, ids):
+    rows = [f"{i},Mon Aug 25 23:59:31 +0000 2025,1,tweet {i},{i},user\n" for i in ids]
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_seen_index_is_idempotent(tmp_path):
+    index = SeenIndex(str(tmp_path / "seen.sqlite"))
+    index.add(["1", "2"], source="a.csv")
+    index.add(["2", "3"], source="b.csv")
+    assert len(index) == 3
+    assert index.seen(["2", "3", "4"]) == {"2", "3"}
+    index.close()
+    assert len(SeenIndex(str(tmp_path / "seen.sqlite"))) == 3
+
+
+def test_ingest_appends_only_new_ids(tmp_path):
+    store = str(tmp_path / "gabungan.csv")
+    first = _crawl(tmp_path / "a.csv", ["1960129945340166460", "1960129945340166461"])
+    second = _crawl(tmp_path / "b.csv", ["1960129945340166461", "1960129945340166462", "1960129945340166462"])
+
+    assert ingest([first], store_path=store)["appended"] == 2
+    stats = ingest([first, second], store_path=store)
+    assert stats == {'files': 2, 'rows_read': 5, 'duplicates_in_batch': 2, 'already_seen': 2, 'appended': 1}
+    assert ingest([second], store_path=store)["appended"] == 0
+
+    stored = pd.read_csv(store, dtype={"id_str": "string"}, encoding="utf-8-sig")
+    assert stored["id_str"].tolist() == ["1960129945340166460", "1960129945340166461", "1960129945340166462"]
+    assert stored["created_at"].iloc[0] == "Mon Aug 25 23:59:31 +0000 2025"
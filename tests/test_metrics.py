@@ -0,0 +1,31 @@
+import os
+
+from spam_detection.metrics import METRICS_PATH, Metrics, MetricsWriter, read_metrics
+from spam_detection.registry import OUTPUT_DIR, list_runs, record_artifact
+
+
+def test_writer_defaults_to_shared_output_dir():
+    # Notebook, service, dan dashboard memakai default yang sama
+    assert MetricsWriter().path == METRICS_PATH
+    assert os.path.dirname(METRICS_PATH) == OUTPUT_DIR
+
+
+def test_writer_creates_output_dir_and_round_trips(tmp_path):
+    registry = Metrics()
+    registry.inc('tweets_classified_total', 3)
+    path = str(tmp_path / OUTPUT_DIR / "run_metrics.json")
+    with MetricsWriter(path, registry=registry, interval=60, run_id="20250828_070506"):
+        pass
+    metrics = read_metrics(path)
+    assert metrics['status'] == "finished" and metrics['run_id'] == "20250828_070506"
+    assert metrics['history'][-1]['tweets'] == 3
+
+
+def test_recorded_artifacts_are_listed(tmp_path):
+    output_dir = str(tmp_path / OUTPUT_DIR)
+    os.makedirs(output_dir)
+    detail = os.path.join(output_dir, "hasil.csv")
+    open(detail, "w").close()
+    record_artifact(output_dir, "20250828_070506", 'detail', detail)
+    [run] = list_runs(output_dir)
+    assert run['run_id'] == "20250828_070506" and run['artifacts']['detail'] == detail
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spam_detection.prefilter import Prefilter, compute_features, rule_scores
+
+SPAM = "PROMO GRATIS!!! klik bit.ly/abc dapat bonus slot gacor"
+PROMO = "promo diskon akhir bulan di toko sebelah"
+PLAIN = "rapat dpr membahas anggaran pendidikan hari ini"
+NEAR_SPAM = "promo gratis!!! cek bit.ly/abc"  # rule ~0.77, tepat di bawah spam_threshold
+
+
+class FixedModel:
+    """Model palsu dengan probabilitas spam tetap per teks."""
+
+    def __init__(self, proba):
+        self.proba = proba
+
+    def predict_proba(self, texts):
+        p = np.array([self.proba[t] for t in texts])
+        return np.column_stack([1 - p, p])
+
+
+def _labels(decisions):
+    return [None if pd.isna(label) else label for label in decisions["prefilter_label"]]
+
+
+def _decide(prefilter, texts):
+    return prefilter.decide(pd.DataFrame({"processed_text": texts}))
+
+
+def test_rule_scores():
+    scores = rule_scores(compute_features(pd.Series([SPAM, PROMO, PLAIN, "https://bit.ly/xyz"])))
+    assert scores.tolist() == pytest.approx([1 - 0.55 * 0.55 * 0.75 * 0.4, 0.45, 0, 1 - 0.55 * 0.3])
+
+
+def test_without_model_only_spam_is_decided():
+    decisions = _decide(Prefilter(spam_threshold=0.8, not_spam_threshold=0.1), [SPAM, PLAIN])
+    assert _labels(decisions) == ["Spam", None]
+
+
+def test_both_cutoffs_use_combined_score():
+    prefilter = Prefilter(spam_threshold=0.8, not_spam_threshold=0.1)
+    prefilter.model = FixedModel({SPAM: 0.05, PROMO: 0.5, PLAIN: 0.03, "ikut undian hadiah": 0.9, "lapor": 0.08,
+                                  NEAR_SPAM: 0.02})
+    texts = [SPAM, PROMO, PLAIN, "ikut undian hadiah", "lapor", NEAR_SPAM]
+    decisions = _decide(prefilter, texts)
+    # Rule kuat tetap Spam walau model ragu; model yakin -> Spam walau tanpa rule;
+    # rule tinggi + model ragu tidak pernah Not Spam lokal, tapi dikirim ke LLM
+    assert _labels(decisions) == ["Spam", None, "Not Spam", "Spam", "Not Spam", None]
+    assert decisions["prefilter_score"].tolist() == pytest.approx([1 - 0.55 * 0.55 * 0.75 * 0.4, 0.5, 0.03, 0.9, 0.08,
+                                                                    1 - 0.55 * 0.55 * 0.75])
+    assert prefilter.stats == {'total': 6, 'local_spam': 2, 'local_not_spam': 2, 'to_llm': 2}
+
+
+def test_fit_model_on_toy_set():
+    pytest.importorskip("sklearn")
+    spam = [f"promo gratis saldo bonus klik link nomor {i}" for i in range(20)]
+    ham = [f"rapat dpr membahas anggaran pendidikan sesi {i}" for i in range(20)]
+    prefilter = Prefilter(spam_threshold=0.8).fit_model(pd.DataFrame({
+        "processed_text": spam + ham, "spam_classification": ["Spam"] * 20 + ["Not Spam"] * 20}))
+    assert prefilter.not_spam_threshold == 0.1
+    decisions = _decide(prefilter, ["promo gratis saldo bonus klik link nomor 99",
+                                    "rapat dpr membahas anggaran pendidikan sesi 99"])
+    assert _labels(decisions) == ["Spam", "Not Spam"]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spam_detection.report import OTHER, build_report, criteria_ids, indicator_matrix
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1, 2, 8", (1, 2, 8)),
+    ("1 (ALL CAPS), 8 (Excessive punctuation)", (3, 4)),
+    ("Tidak ada indikator spam", ()),
+    ("-", ()),
+    ("sesuatu yang aneh", (OTHER,)),
+])
+def test_criteria_ids_normalization(text, expected):
+    assert criteria_ids(text) == expected
+
+
+def test_indicator_matrix_accepts_lists_and_strings():
+    codes, matrix = indicator_matrix([["1, 2"], "['1, 2']", np.array(["ALL CAPS"], dtype=object), None])
+    assert matrix[codes[0]].nonzero()[0].tolist() == [1, 2]
+    assert matrix[codes[1]].nonzero()[0].tolist() == [1, 2]
+    assert matrix[codes[2]].nonzero()[0].tolist() == [4]
+    assert not matrix[codes[3]].any()
+
+
+def test_build_report_counts():
+    df = pd.DataFrame({
+        "id_str": ["1", "2", "3", "4"],
+        "created_at": ["Mon Aug 25 23:59:31 +0000 2025"] * 4,
+        "username": ["a", "a", "b", "c"],
+        "processed_text": ["promo", "slot", "berita", "rapat"],
+        "spam_classification": ["Spam", "Spam", "Not Spam", "Error"],
+        "confidence_score": [9, 7, 3, None],
+        "spam_indicators": ["['1, 2']", "['10']", "[]", "[]"],
+        "spam_reason": ["x", "x", "x", "Error: timeout"],
+    })
+    report = build_report(df)
+    summary = report["summary"]
+    assert (summary["total"], summary["spam"], summary["not_spam"], summary["errors"]) == (4, 2, 2, 1)
+    assert summary["avg_conf_spam"] == 8
+    assert dict(zip(report["criteria"]["criterion"], report["criteria"]["tweets"])) == {1: 1, 2: 1, 10: 1}
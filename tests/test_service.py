@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+
+from spam_detection import service as service_module
+from spam_detection.backends import StubLLM
+from spam_detection.batch import BatchClassifier
+from spam_detection.service import QueueFull, ScoringService
+from spam_detection.storage import read_results
+
+
+def _tweets(start, stop):
+    return [{"id_str": str(i), "full_text": f"tweet nomor {i} tentang gedung dpr",
+             "created_at": "Mon Aug 25 23:59:31 +0000 2025"} for i in range(start, stop)]
+
+
+def _service(tmp_path, **kwargs):
+    classifier = BatchClassifier(StubLLM(latency=0), max_workers=2, rate_per_sec=1000)
+    return ScoringService(classifier, output_dir=str(tmp_path), flush_interval=3600,
+                          batch_size=16, max_wait=0.01, **kwargs)
+
+
+async def _drain(service):
+    await service._queue.join()
+
+
+def test_failed_append_keeps_results_for_next_flush(tmp_path, monkeypatch):
+    real_append = service_module.append_results
+    calls = []
+
+    def flaky_append(results_df, root):
+        calls.append(len(results_df))
+        if len(calls) == 2:
+            raise OSError("disk penuh")
+        return real_append(results_df, root)
+
+    monkeypatch.setattr(service_module, "append_results", flaky_append)
+
+    async def scenario():
+        service = await _service(tmp_path).start()
+        assert await service.submit(_tweets(0, 50)) == 50
+        await _drain(service)
+        assert await service.flush() == 50
+
+        await service.submit(_tweets(50, 80))
+        await _drain(service)
+        with pytest.raises(OSError):
+            await service.flush()
+        # Tweet yang gagal disimpan tetap inflight: kirim ulang diabaikan, bukan hilang
+        assert await service.submit(_tweets(50, 80)) == 0
+        assert await service.flush() == 30
+        await service.stop()
+        return service
+
+    service = asyncio.run(scenario())
+    assert service.stats['scored'] == 80
+    stored = read_results(service.root, columns=["id_str"])
+    assert sorted(stored["id_str"].astype(int)) == list(range(80))
+
+
+def test_accept_rejects_when_queue_full(tmp_path):
+    async def scenario():
+        service = _service(tmp_path, max_queue=10, concurrency=0)
+        await service.start()
+        assert service.accept(_tweets(0, 8)) == 8
+        with pytest.raises(QueueFull):
+            service.accept(_tweets(8, 12))
+        # Duplikat yang masih di antrean tidak dihitung ulang
+        assert service.accept(_tweets(0, 8)) == 0
+        service.seen.close()
+        return service
+
+    service = asyncio.run(scenario())
+    assert service.stats['rejected'] == 4
+
+
+def test_pending_buffer_is_capped_while_flush_fails(tmp_path, monkeypatch):
+    def broken_append(results_df, root):
+        raise OSError("disk penuh")
+
+    real_append = service_module.append_results
+    monkeypatch.setattr(service_module, "append_results", broken_append)
+
+    async def scenario():
+        service = await _service(tmp_path, max_pending=16, concurrency=1).start()
+        assert service.accept(_tweets(0, 16)) == 16
+        await _drain(service)
+        assert service._pending_rows == 16
+        # Buffer penuh: HTTP ditolak (429) dan worker tidak mengambil batch baru
+        status, _, headers = service._route("POST", "/tweets", json.dumps(_tweets(16, 20)).encode())
+        assert status == 429 and "Retry-After" in headers
+        with pytest.raises(OSError):
+            await service.flush()
+        assert service._pending_rows == 16
+        await service.submit(_tweets(16, 48))
+        await asyncio.sleep(0.05)
+        assert service._pending_rows == 16 and service._queue.qsize() == 32
+
+        monkeypatch.setattr(service_module, "append_results", real_append)
+        assert await service.flush() == 16
+        await service.stop()
+        return service
+
+    service = asyncio.run(scenario())
+    stored = read_results(service.root, columns=["id_str"])
+    assert sorted(stored["id_str"].astype(int)) == list(range(48))
@@ -0,0 +1,124 @@
+import os
+
+import pandas as pd
+import pytest
+
+from spam_detection import storage
+from spam_detection.storage import (append_results, compact_results, parse_created_at, parse_indicators,
+                                    read_results, read_texts, write_results)
+
+
+def _results(start, stop, day="25"):
+    return pd.DataFrame({
+        "id_str": [str(1960129945340166460 + i) for i in range(start, stop)],
+        "created_at": [f"Mon Aug {day} 23:59:31 +0000 2025"] * (stop - start),
+        "processed_text": [f"tweet {i}" for i in range(start, stop)],
+        "full_text": [f"tweet {i}" for i in range(start, stop)],
+        "spam_classification": ["Spam" if i % 2 else "Not Spam" for i in range(start, stop)],
+        "confidence_score": [8] * (stop - start),
+        "spam_indicators": [str(["1, 2"]) if i % 2 else "[]" for i in range(start, stop)],
+        "spam_reason": ["alasan"] * (stop - start),
+    })
+
+
+def _ids(root):
+    return sorted(read_results(root, columns=["id_str"])["id_str"])
+
+
+def test_compaction_never_exposes_duplicates_or_missing_files(tmp_path):
+    root = str(tmp_path / "run")
+    for i in range(4):
+        append_results(_results(i * 5, i * 5 + 5), root)
+    expected = _ids(root)
+
+    # Tepat setelah file gabungan muncul: sumber masih ada, tapi tidak dibaca dua kali
+    assert compact_results(root, min_files=2) == 8  # 4 file deteksi + 4 file teks
+    assert _ids(root) == expected
+    partition = os.path.join(root, storage.DETECTIONS_DIR, "created_date=2025-08-25")
+    assert len(os.listdir(partition)) == 5
+
+    # Sumber dihapus pada compaction berikutnya setelah masa tenggang
+    compact_results(root, min_files=2, grace_seconds=0)
+    assert len(os.listdir(partition)) == 1
+    assert _ids(root) == expected
+    assert len(read_texts(root)) == len(expected)
+
+
+def test_reader_retries_when_file_vanishes(tmp_path, monkeypatch):
+    root = str(tmp_path / "run")
+    for i in range(2):
+        append_results(_results(i * 5, i * 5 + 5), root)
+    real_dataset = storage._dataset
+    calls = []
+
+    def racing_dataset(root_, subdir):
+        dataset = real_dataset(root_, subdir)
+        if not calls:
+            # Compaction menghapus sumber setelah pembaca mendaftar file
+            compact_results(root, min_files=2)
+            compact_results(root, min_files=2, grace_seconds=0)
+        calls.append(subdir)
+        return dataset
+
+    monkeypatch.setattr(storage, "_dataset", racing_dataset)
+    assert len(_ids(root)) == 10
+    assert len(calls) == 2
+
+
+def test_round_trip_dtypes(tmp_path):
+    df = _results(0, 10)
+    root = write_results(df, str(tmp_path / "run"))
+    back = read_results(root)
+    assert str(back["spam_classification"].dtype) == "category"
+    assert str(back["confidence_score"].dtype) == "Int8"
+    assert back["id_str"].tolist() == df["id_str"].tolist()  # id 19 digit utuh
+    assert list(back["spam_indicators"].iloc[1]) == ["1, 2"]
+    assert list(back["spam_indicators"].iloc[0]) == []
+    assert "full_text" not in back
+    texts = read_texts(root, columns=["spam_reason"], ids=df["id_str"][:3])
+    assert sorted(texts["id_str"]) == sorted(df["id_str"][:3])
+
+
+def test_rewrite_drops_stale_partitions(tmp_path):
+    root = str(tmp_path / "run")
+    write_results(pd.concat([_results(0, 3, day="24"), _results(3, 6)]), root)
+    write_results(_results(0, 4, day="26"), root)
+    assert sorted(os.listdir(os.path.join(root, storage.DETECTIONS_DIR))) == ["created_date=2025-08-26"]
+    assert len(_ids(root)) == 4 and len(read_texts(root)) == 4
+    assert os.listdir(tmp_path) == ["run"]  # tidak ada direktori staging tersisa
+
+
+def test_parse_helpers():
+    assert parse_indicators(["['a', 'b']", "teks bebas", None]).tolist() == [["a", "b"], ["teks bebas"], []]
+    parsed = parse_created_at(pd.Series(["Mon Aug 25 23:59:31 +0000 2025", None]))
+    assert parsed.iloc[0] == pd.Timestamp("2025-08-25 23:59:31", tz="UTC")
+    assert pd.isna(parsed.iloc[1])
+
+
+def test_read_missing_columns_are_ignored(tmp_path):
+    root = write_results(_results(0, 3), str(tmp_path / "run"))
+    assert list(read_results(root, columns=["id_str", "tidak_ada"]).columns) == ["id_str"]
+    with pytest.raises(KeyError):
+        read_results(root)["tidak_ada"]
+
+
+def test_chained_compaction_keeps_rows_and_cleans_up(tmp_path):
+    partition_name = os.path.join(storage.DETECTIONS_DIR, "created_date=2025-08-25")
+    for run in range(10):
+        root = str(tmp_path / f"run{run}")
+        append_results(_results(0, 5), root)
+        append_results(_results(5, 10), root)
+        compact_results(root, min_files=2)
+        append_results(_results(10, 15), root)
+        append_results(_results(15, 20), root)
+        # File gabungan kedua mencakup file gabungan pertama (masih kecil)
+        compact_results(root, min_files=2)
+        expected = [str(1960129945340166460 + i) for i in range(20)]
+        assert _ids(root) == expected
+
+        compact_results(root, min_files=2, grace_seconds=0)
+        assert _ids(root) == expected
+        compact_results(root, min_files=2, grace_seconds=0)
+        assert _ids(root) == expected
+        assert len(os.listdir(os.path.join(root, partition_name))) == 1
+        assert len(read_texts(root)) == 20
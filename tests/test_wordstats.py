@@ -0,0 +1,54 @@
+from collections import Counter
+
+import pandas as pd
+
+from spam_detection.wordstats import SpaceSaving, WordStats, compute_word_stats, count_words, iter_frames
+
+
+def test_count_words_drops_stopwords_and_short_tokens():
+    counts = count_words(["Promo GRATIS yang ada di sini", "promo lagi", None], stopwords={"yang"}, min_len=3)
+    assert counts == Counter({"promo": 2, "gratis": 1, "ada": 1, "sini": 1, "lagi": 1})
+
+
+def test_space_saving_keeps_heavy_hitters():
+    summary = SpaceSaving(capacity=3)
+    summary.update(Counter({"a": 10, "b": 5, "c": 1}))
+    summary.update(Counter({"d": 2}))
+    assert len(summary) == 3 and summary.total == 18
+    # "d" masuk dengan error = hitungan minimum sebelumnya
+    assert summary.counts["d"] == 3 and summary.errors["d"] == 1
+    assert summary.top(2) == [("a", 10), ("b", 5)]
+
+
+def test_space_saving_merge_matches_exact_counts_within_capacity():
+    left, right = SpaceSaving(capacity=10), SpaceSaving(capacity=10)
+    left.update(Counter({"a": 3, "b": 1}))
+    right.update(Counter({"a": 2, "c": 4}))
+    merged = left.merge(right)
+    assert merged.counts == {"a": 5, "b": 1, "c": 4}
+    assert set(merged.errors.values()) == {0}
+    assert merged.total == 10
+
+
+def test_space_saving_merge_bounds_error():
+    left, right = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+    left.update(Counter({"a": 9, "b": 4}))
+    right.update(Counter({"a": 1, "c": 6}))
+    merged = left.merge(right)
+    # Hitungan tidak pernah underestimate; overestimate <= error
+    exact = {"a": 10, "b": 4, "c": 6}
+    for word, count in merged.counts.items():
+        assert exact[word] <= count <= exact[word] + merged.errors[word]
+    assert len(merged) == 2 and merged.counts["a"] == 10
+
+
+def test_word_stats_chunks_merge_like_single_pass():
+    df = pd.DataFrame({
+        "processed_text": ["promo gratis", "berita rapat", "promo bonus", "rapat paripurna"] * 5,
+        "spam_classification": ["Spam", "Not Spam", "Spam", "Not Spam"] * 5,
+    })
+    single = WordStats().update(df["processed_text"], df["spam_classification"])
+    chunked = compute_word_stats(iter_frames(df, chunksize=3))
+    assert chunked.summary() == single.summary()
+    assert chunked.summary()["top_spam_words"][0] == ("promo", 10)
+    assert chunked.tweets == Counter({"Spam": 10, "Not Spam": 10})